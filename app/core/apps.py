@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+
+        from core.metrics import install_query_counter
+        from core.timing import install_sql_timer
+
+        connection_created.connect(install_sql_timer)
+        connection_created.connect(install_query_counter)
+
+        from myproject.dbRouter import check_pin_cache
+
+        checks.register(check_pin_cache, checks.Tags.database)
@@ -0,0 +1,169 @@
+"""
+Async views serving the GET requests of DRF views natively under ASGI
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.core.exceptions import ValidationError
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from myproject.dbRouter import use_replica
+
+
+async def authenticate(request):
+    """Async counterpart of Request._authenticate"""
+    for authenticator in request.authenticators:
+        try:
+            if hasattr(authenticator, "aauthenticate"):
+                user_auth = await authenticator.aauthenticate(request)
+            else:
+                user_auth = await sync_to_async(authenticator.authenticate)(
+                    request
+                )
+        except APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth
+            return
+
+    request._not_authenticated()
+
+
+class AsyncAPIView(View):
+    """
+    Run a DRF view's GET handler as a coroutine.
+
+    The DRF view class is reused as is: its authentication, permissions,
+    querysets, serializers and pagination all apply. GET requests call the
+    view's async handler, a<action> for viewsets or aget otherwise, when it
+    has one and the client negotiated JSON. Everything else is handed to
+    the regular sync view in a thread.
+    """
+
+    # dispatch is a coroutine for every method, not only the handlers.
+    view_is_async = True
+    view_class = None
+    actions = None
+    view_initkwargs = None
+    sync_view = None
+
+    @classonlymethod
+    def as_view(cls, view_class, actions=None, **initkwargs):
+        if actions:
+            sync_view = view_class.as_view(actions, **initkwargs)
+        else:
+            sync_view = view_class.as_view(**initkwargs)
+
+        view = super().as_view(
+            view_class=view_class,
+            actions=actions,
+            view_initkwargs=initkwargs,
+            sync_view=sync_view,
+        )
+        # As for APIView, token authenticated requests need no CSRF check.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        view = self.get_async_view(request, args, kwargs)
+        if view is None:
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+
+        # As ReplicaReadsMixin.dispatch, routing ends with the request.
+        token = use_replica.set(False)
+        try:
+            response = await self.get_response(view, args, kwargs)
+        finally:
+            use_replica.reset(token)
+
+        response = view.finalize_response(
+            view.request, response, *args, **kwargs
+        )
+        return response.render()
+
+    async def get_response(self, view, args, kwargs):
+        """Run the checks of APIView.initial and the async handler"""
+        try:
+            await authenticate(view.request)
+            view.check_permissions(view.request)
+            view.check_throttles(view.request)
+            if hasattr(view, "route_reads"):
+                view.route_reads(view.request)
+            handler = getattr(view, self.get_handler_name(view))
+            return await handler(view.request, *args, **kwargs)
+        except Exception as exc:
+            return view.handle_exception(exc)
+
+    def get_handler_name(self, view):
+        return f"a{getattr(view, 'action', None) or 'get'}"
+
+    def get_async_view(self, request, args, kwargs):
+        """Return the DRF view set up as in APIView.initial, or None"""
+        if request.method != "GET":
+            return None
+
+        view = self.view_class(**self.view_initkwargs)
+        if self.actions:
+            view.action_map = self.actions
+        view.args = args
+        view.kwargs = kwargs
+        view.request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        if not hasattr(view, self.get_handler_name(view)):
+            return None
+
+        try:
+            view.format_kwarg = view.get_format_suffix(**kwargs)
+            renderer, media_type = view.perform_content_negotiation(
+                view.request
+            )
+            version, scheme = view.determine_version(
+                view.request, *args, **kwargs
+            )
+        except APIException:
+            # Let the sync view produce the error response.
+            return None
+
+        # The browsable API renders templates, keep it on the sync path.
+        if renderer.format != "json":
+            return None
+
+        view.request.accepted_renderer = renderer
+        view.request.accepted_media_type = media_type
+        view.request.version = version
+        view.request.versioning_scheme = scheme
+        return view
+
+
+class AsyncRetrieveMixin:
+    """Retrieve a model instance with the async ORM"""
+
+    async def aget_object(self):
+        """Async counterpart of GenericAPIView.get_object"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.aget(**lookup)
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise Http404
+
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
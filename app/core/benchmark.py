@@ -0,0 +1,81 @@
+"""
+Helpers shared by the benchmark management commands
+"""
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from core.models import Recipe, Tags
+
+BATCH_SIZE = 5000
+
+
+def measure(func, repeat):
+    """Call func repeat times and return the durations in seconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+def percentile(samples, percent):
+    """Return the nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(samples):
+    """Return latency statistics in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def create_bench_user(email, password=None):
+    """Return a fresh benchmark user, replacing any previous one"""
+    get_user_model().objects.filter(email=email).delete()
+    return get_user_model().objects.create_user(email, password)
+
+
+def seed_recipes(user, count, tag_count=10, seed=0):
+    """Create count random recipes for the user linked to random tags"""
+    rng = random.Random(seed)
+    tags = Tags.objects.bulk_create(
+        [Tags(user=user, name=f"tag {index}") for index in range(tag_count)]
+    )
+
+    through = Recipe.tags.through
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        recipes = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    user=user,
+                    title=f"Recipe {start + index}",
+                    time_minutes=rng.randint(1, 240),
+                    price=Decimal(rng.randint(100, 10000)) / 100,
+                    description="Generated by a benchmark",
+                )
+                for index in range(size)
+            ]
+        )
+        through.objects.bulk_create(
+            [
+                through(recipe_id=recipe.id, tags_id=tag.id)
+                for recipe in recipes
+                for tag in rng.sample(tags, 2)
+            ]
+        )
+
+    return tags
@@ -0,0 +1,276 @@
+"""
+Django command to load test the recipe and user API endpoints
+
+"""
+import http.client
+import itertools
+import json
+import platform
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest import mock
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from core import benchmark
+from user.throttling import SlidingWindowThrottle
+
+BENCH_PASSWORD = "bench-password-123"
+
+# name: (method, path)
+ENDPOINTS = {
+    "recipes": ("GET", "/api/recipe/recipes/?page_size=20"),
+    "tags": ("GET", "/api/recipe/tags/"),
+    "token": ("POST", "/api/user/token/"),
+    "me": ("GET", "/api/user/me/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset and report requests/second and latency "
+        "percentiles per endpoint as JSON. Requests go through Django's "
+        "in-process handler, or over HTTP with --url to a running server "
+        "on the same database; raise THROTTLE_LOGIN_IP and "
+        "THROTTLE_LOGIN_EMAIL on that server for the token endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument(
+            "--recipes", type=int, default=1000, help="Recipes per user"
+        )
+        parser.add_argument("--tags", type=int, default=10, help="Per user")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--endpoints",
+            default=",".join(ENDPOINTS),
+            help="Comma separated endpoints to load",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Per endpoint"
+        )
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--warmup", type=int, default=20, help="Untimed requests first"
+        )
+        parser.add_argument(
+            "--url",
+            help="Server to load, e.g. http://localhost:8000 (default: "
+            "in-process)",
+        )
+        parser.add_argument(
+            "--bust-cache",
+            action="store_true",
+            help="Vary the list query strings to skip the response cache",
+        )
+        parser.add_argument("--output", help="Also write the JSON here")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated users and recipes",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        names = options["endpoints"].split(",")
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(unknown)}")
+
+        users = self.seed(options)
+        tokens = [Token.objects.get_or_create(user=user)[0] for user in users]
+        send = self.get_sender(options["url"])
+        self.counter = itertools.count()
+
+        # The test client sends requests for the "testserver" host, and in
+        # process every login would count against the rate limits.
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        rates = dict.fromkeys(SlidingWindowThrottle.THROTTLE_RATES)
+        results = []
+        try:
+            with override_settings(ALLOWED_HOSTS=hosts), mock.patch.object(
+                SlidingWindowThrottle, "THROTTLE_RATES", rates
+            ):
+                for name in names:
+                    results.append(
+                        self.run_endpoint(name, send, tokens, options)
+                    )
+        finally:
+            if not options["keep"]:
+                for user in users:
+                    user.delete()
+
+        report = json.dumps(
+            {"meta": self.get_meta(options), "results": results}, indent=2
+        )
+        self.stdout.write(report)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+
+    def seed(self, options):
+        """Create the users with their recipes, the same for a seed"""
+        users = []
+        for index in range(options["users"]):
+            user = benchmark.create_bench_user(
+                f"bench-api-{index}@example.com", BENCH_PASSWORD
+            )
+            benchmark.seed_recipes(
+                user,
+                options["recipes"],
+                tag_count=options["tags"],
+                seed=options["seed"] + index,
+            )
+            users.append(user)
+
+        return users
+
+    def build_request(self, name, token, bust_cache):
+        """Return the method, path, body and headers of one request"""
+        method, path = ENDPOINTS[name]
+        if bust_cache and method == "GET":
+            separator = "&" if "?" in path else "?"
+            path = f"{path}{separator}n={next(self.counter)}"
+
+        if name == "token":
+            body = json.dumps(
+                {"email": token.user.email, "password": BENCH_PASSWORD}
+            )
+            return method, path, body, {}
+
+        headers = {"Authorization": f"Token {token.key}"}
+        return method, path, None, headers
+
+    def run_endpoint(self, name, send, tokens, options):
+        """Send the requests for one endpoint and summarize them"""
+        requests = [
+            self.build_request(
+                name, tokens[index % len(tokens)], options["bust_cache"]
+            )
+            for index in range(options["warmup"] + options["requests"])
+        ]
+        warmup = options["warmup"]
+
+        def fetch(request):
+            start = time.perf_counter()
+            try:
+                status = send(*request)
+            except (OSError, http.client.HTTPException):
+                # Counted as a transport error instead of ending the run.
+                status = None
+            return status, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(fetch, requests[:warmup]))
+            start = time.perf_counter()
+            responses = list(pool.map(fetch, requests[warmup:]))
+            elapsed = time.perf_counter() - start
+
+        statuses = Counter(
+            status for status, _ in responses if status is not None
+        )
+        transport_errors = len(responses) - sum(statuses.values())
+        http_errors = sum(
+            count for status, count in statuses.items() if status >= 400
+        )
+        method, path = ENDPOINTS[name]
+        return {
+            "endpoint": name,
+            "method": method,
+            "path": path,
+            "concurrency": options["concurrency"],
+            "errors": http_errors + transport_errors,
+            "transport_errors": transport_errors,
+            "statuses": {str(status): n for status, n in statuses.items()},
+            "requests_per_second": len(responses) / elapsed,
+            **benchmark.summarize([duration for _, duration in responses]),
+        }
+
+    def get_sender(self, url):
+        """Return a function sending one request, returning its status"""
+        if url is None:
+            return self.get_client_sender()
+
+        parts = urlsplit(url)
+        prefix = parts.path.rstrip("/")
+        if parts.scheme == "https":
+            connection_class = http.client.HTTPSConnection
+        else:
+            connection_class = http.client.HTTPConnection
+        local = threading.local()
+
+        def send(method, path, body, headers):
+            # One keep-alive connection per client thread.
+            if not hasattr(local, "connection"):
+                local.connection = connection_class(parts.netloc, timeout=30)
+            headers = {**headers, "Content-Type": "application/json"}
+            try:
+                local.connection.request(method, prefix + path, body, headers)
+                response = local.connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                local.connection.close()
+                del local.connection
+                raise
+            return response.status
+
+        return send
+
+    def get_client_sender(self):
+        # The test client keeps per-instance state, one per client thread.
+        local = threading.local()
+
+        def send(method, path, body, headers):
+            if not hasattr(local, "client"):
+                local.client = Client()
+            response = local.client.generic(
+                method,
+                path,
+                body or "",
+                content_type="application/json",
+                headers=headers,
+            )
+            return response.status_code
+
+        return send
+
+    def get_meta(self, options):
+        """Describe the run, to compare results across commits"""
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "http" if options["url"] else "in-process",
+            "url": options["url"],
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "users": options["users"],
+            "recipes_per_user": options["recipes"],
+            "tags_per_user": options["tags"],
+            "seed": options["seed"],
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "bust_cache": options["bust_cache"],
+        }
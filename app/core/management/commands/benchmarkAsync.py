@@ -0,0 +1,192 @@
+"""
+Django command to compare API throughput of the sync and async views
+
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from core import benchmark
+from core.models import Recipe
+
+BENCH_EMAIL = "bench-async@local"
+
+DEPLOYMENTS = {
+    "wsgi": {"ASYNC_VIEWS": "0"},
+    "asgi": {"ASYNC_VIEWS": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/second of the WSGI deployment with the async "
+        "views under ASGI, at a given concurrency. Requests go through "
+        "Django's in-process handlers, so this measures the framework "
+        "stack and database, not a web server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1000)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated user and recipes",
+        )
+        parser.add_argument("--json", action="store_true")
+        parser.add_argument(
+            "--worker",
+            choices=list(DEPLOYMENTS),
+            help="Run the load for one deployment (used internally)",
+        )
+        parser.add_argument("--token", help=f"Token of {BENCH_EMAIL}")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if options["worker"]:
+            self.run_worker(options)
+            return
+
+        user = benchmark.create_bench_user(BENCH_EMAIL)
+        benchmark.seed_recipes(user, options["recipes"])
+        token = Token.objects.create(user=user)
+
+        results = []
+        try:
+            for name, env in DEPLOYMENTS.items():
+                results.append(self.run_deployment(name, env, token, options))
+        finally:
+            if not options["keep"]:
+                user.delete()
+
+        self.report(results, options)
+
+    def run_deployment(self, name, env, token, options):
+        """Run a worker process with the deployment's URL configuration"""
+        # ASYNC_VIEWS is read when the URLs are loaded, so each
+        # deployment needs a fresh process.
+        command = [
+            sys.executable,
+            os.path.join(settings.BASE_DIR, "manage.py"),
+            "benchmarkAsync",
+            f"--worker={name}",
+            f"--token={token.key}",
+            f"--requests={options['requests']}",
+            f"--concurrency={options['concurrency']}",
+        ]
+        process = subprocess.run(
+            command,
+            env={**os.environ, **env},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise CommandError(f"{name} worker failed:\n{process.stderr}")
+
+        return {"deployment": name, **json.loads(process.stdout)}
+
+    def get_paths(self, token):
+        """Return the request mix: lists, details and the profile"""
+        ids = Recipe.objects.filter(user=token.user_id).values_list(
+            "id", flat=True
+        )[:50]
+        paths = [
+            "/api/recipe/recipes/?page_size=20",
+            "/api/recipe/tags/",
+            "/api/user/me/",
+        ]
+        return paths + [f"/api/recipe/recipes/{pk}/" for pk in ids]
+
+    def run_worker(self, options):
+        token = Token.objects.get(key=options["token"])
+        paths = self.get_paths(token)
+        paths = [paths[i % len(paths)] for i in range(options["requests"])]
+        headers = {"Authorization": f"Token {token.key}"}
+
+        # The test clients send requests for the "testserver" host.
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts):
+            if options["worker"] == "asgi":
+                samples, elapsed = asyncio.run(
+                    self.load_async(paths, headers, options["concurrency"])
+                )
+            else:
+                samples, elapsed = self.load_threads(
+                    paths, headers, options["concurrency"]
+                )
+
+        self.stdout.write(
+            json.dumps(
+                {
+                    "concurrency": options["concurrency"],
+                    "requests_per_second": len(samples) / elapsed,
+                    **benchmark.summarize(samples),
+                }
+            )
+        )
+
+    def load_threads(self, paths, headers, concurrency):
+        """Send the requests from a pool of threads, as WSGI workers do"""
+        # The test client keeps per-instance state, one per client thread.
+        local = threading.local()
+
+        def fetch(path):
+            if not hasattr(local, "client"):
+                local.client = Client()
+            start = time.perf_counter()
+            response = local.client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f"{path}: {response.status_code}")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(fetch, paths))
+        return samples, time.perf_counter() - start
+
+    async def load_async(self, paths, headers, concurrency):
+        """Keep concurrency requests in flight on one event loop"""
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(path):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                if response.status_code != 200:
+                    raise CommandError(f"{path}: {response.status_code}")
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        samples = await asyncio.gather(*[fetch(path) for path in paths])
+        return samples, time.perf_counter() - start
+
+    def report(self, results, options):
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{options['requests']} requests, "
+            f"concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'deployment':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['deployment']:<10} "
+                f"{row['requests_per_second']:>8.0f} "
+                f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+            )
@@ -0,0 +1,112 @@
+"""
+Django command to benchmark recipe list latency with and without
+persistent database connections
+
+"""
+import itertools
+import json
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory, override_settings
+from rest_framework.authtoken.models import Token
+
+from core import benchmark
+
+BENCH_EMAIL = "bench-connections@local"
+RECIPE_URL = "/api/recipe/recipes/"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time GET /api/recipe/recipes/ through the WSGI handler, opening "
+        "a connection per request (CONN_MAX_AGE=0) and reusing it. Point "
+        "DB_HOST at PgBouncer to measure an external pooler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=500)
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE of the persistent run",
+        )
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--keep", action="store_true")
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if options["database"] not in connections:
+            raise CommandError(f"Unknown database {options['database']}")
+
+        user = benchmark.create_bench_user(BENCH_EMAIL)
+        benchmark.seed_recipes(user, options["recipes"])
+        token = Token.objects.create(user=user)
+
+        # Distinct query strings skip the list response cache.
+        self.counter = itertools.count()
+        modes = {"per request": 0, "persistent": options["conn_max_age"]}
+        connection = connections[options["database"]]
+        original = connection.settings_dict["CONN_MAX_AGE"]
+        results = []
+        try:
+            for name, max_age in modes.items():
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                samples = self.run_requests(token, options["repeat"])
+                results.append(
+                    {
+                        "mode": name,
+                        "conn_max_age": max_age,
+                        **benchmark.summarize(samples),
+                    }
+                )
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = original
+            if not options["keep"]:
+                user.delete()
+
+        self.report(results, options["json"])
+
+    def run_requests(self, token, repeat):
+        """Send the requests through the WSGI handler, like a server"""
+        # The test client keeps connections open, the WSGI handler closes
+        # them at the end of each request as CONN_MAX_AGE says.
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        def start_response(status, headers):
+            if not status.startswith("200"):
+                raise CommandError(f"{RECIPE_URL}: {status}")
+
+        def fetch():
+            environ = factory.get(
+                RECIPE_URL,
+                {"page_size": 20, "n": next(self.counter)},
+                HTTP_AUTHORIZATION=f"Token {token.key}",
+            ).environ
+            response = handler(environ, start_response)
+            b"".join(response)
+            response.close()
+
+        with override_settings(ALLOWED_HOSTS=hosts):
+            return benchmark.measure(fetch, repeat)
+
+    def report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'mode':<12} {'p50 ms':>8} {'p99 ms':>8}")
+        for row in results:
+            self.stdout.write(
+                f"{row['mode']:<12} {row['p50_ms']:>8.2f} "
+                f"{row['p99_ms']:>8.2f}"
+            )
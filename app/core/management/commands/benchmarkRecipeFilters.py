@@ -0,0 +1,94 @@
+"""
+Django command to benchmark filtered recipe list queries by dataset size
+
+"""
+import json
+
+from django.core.management.base import BaseCommand
+from django.http import HttpRequest, QueryDict
+from rest_framework.request import Request
+
+from core import benchmark
+from recipe.views import RecipeViewSet
+
+FILTERS = {
+    "unfiltered": "",
+    "tags": "tags={tags}",
+    "price_max": "price_max=20",
+    "time_max": "time_max=30",
+    "combined": "tags={tags}&price_max=20&time_max=30",
+}
+
+
+class Command(BaseCommand):
+    help = "Time the first page of filtered recipe lists as data grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000,10000,100000",
+            help="Comma separated recipe counts per user",
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated users and recipes",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        results = []
+        for size in [int(size) for size in options["sizes"].split(",")]:
+            user = benchmark.create_bench_user(f"bench-filters-{size}@local")
+            tags = benchmark.seed_recipes(user, size)
+            tag_ids = f"{tags[0].id},{tags[1].id}"
+
+            for name, query in FILTERS.items():
+                view = self.get_view(user, query.format(tags=tag_ids))
+                samples = benchmark.measure(
+                    lambda: self.fetch_page(view), options["repeat"]
+                )
+                results.append(
+                    {
+                        "recipes": size,
+                        "filter": name,
+                        **benchmark.summarize(samples),
+                    }
+                )
+
+            if not options["keep"]:
+                user.delete()
+
+        self.report(results, options["json"])
+
+    def get_view(self, user, query):
+        """Return a recipe list view for the user and query string"""
+        http_request = HttpRequest()
+        http_request.method = "GET"
+        http_request.GET = QueryDict(query)
+        request = Request(http_request)
+        request.user = user
+        return RecipeViewSet(
+            request=request, action="list", format_kwarg=None, kwargs={}
+        )
+
+    def fetch_page(self, view):
+        """Run the list queries for the first page, as the view does"""
+        queryset = view.filter_queryset(view.get_queryset())
+        return view.paginate_queryset(queryset)
+
+    def report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'recipes':>8} {'filter':<12} {'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['recipes']:>8} {row['filter']:<12} "
+                f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+            )
@@ -0,0 +1,76 @@
+"""
+Django command to compare the JSON renderers on recipe list payloads
+
+"""
+import json
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import benchmark
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+
+
+def recipe_list_payload(count):
+    """Return a paginated recipe list shaped like the API response"""
+    return {
+        "next": "http://testserver/api/recipe/recipes/?cursor=WzEwMF0",
+        "results": [
+            {
+                "id": index,
+                "title": f"Recipe number {index}",
+                "time_minutes": index % 240,
+                "price": str(Decimal(index % 10000) / 100),
+                "tags": ["Dinner", "Vegan"],
+            }
+            for index in range(count)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark FastJSONRenderer/Parser against DRF's JSON classes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        data = recipe_list_payload(options["items"])
+        body = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != body:
+            self.stderr.write(self.style.WARNING("Rendered output differs"))
+
+        cases = {
+            "render stdlib": lambda: JSONRenderer().render(data),
+            "render fast": lambda: FastJSONRenderer().render(data),
+            "parse stdlib": lambda: JSONParser().parse(BytesIO(body)),
+            "parse fast": lambda: FastJSONParser().parse(BytesIO(body)),
+        }
+        results = {
+            name: benchmark.summarize(
+                benchmark.measure(func, options["repeat"])
+            )
+            for name, func in cases.items()
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        if orjson is None:
+            self.stdout.write("orjson is not installed, fast uses stdlib")
+        self.stdout.write(
+            f"{options['items']} recipes, {len(body)} bytes per payload"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<14} p50 {stats['p50_ms']:8.3f} ms  "
+                f"p99 {stats['p99_ms']:8.3f} ms"
+            )
@@ -0,0 +1,143 @@
+"""
+Django command to EXPLAIN the API querysets and report missing indexes
+
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpRequest
+from rest_framework.request import Request
+
+from core.models import Recipe, Tags
+from recipe import views
+
+# "Seq Scan on <table>" on PostgreSQL, "SCAN <table>" on SQLite.
+SEQ_SCAN_RE = re.compile(r"(?:Seq Scan on|\bSCAN) (?P<table>\w+)")
+
+THROUGH_INDEXES = {
+    Recipe.tags.through._meta.db_table: ["core_recipe_tags_tags_recipe_idx"],
+}
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the API list querysets and report index issues"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User whose querysets are explained (default: first user)",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Execute the queries and report actual timings",
+        )
+        parser.add_argument(
+            "--allow-seqscan",
+            action="store_true",
+            help="Do not disable sequential scans on PostgreSQL",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error if any problem is found",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        user = self.get_user(options["email"])
+        problems = self.check_indexes()
+
+        for name, queryset in self.get_querysets(user):
+            plan = self.explain(queryset, options)
+            scans = self.find_sequential_scans(plan)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            for table in scans:
+                problems.append(f"{name}: sequential scan on {table}")
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("No index problems found"))
+            return
+
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+        if options["fail"]:
+            raise CommandError(f"{len(problems)} index problem(s) found")
+
+    def get_user(self, email):
+        """Return the user to build querysets for"""
+        users = get_user_model().objects.order_by("id")
+        user = users.filter(email=email).first() if email else users.first()
+        if user is None:
+            raise CommandError("No matching user found")
+        return user
+
+    def get_querysets(self, user):
+        """Yield the list querysets exactly as the viewsets build them"""
+        request = Request(HttpRequest())
+        request.method = "GET"
+        request.user = user
+
+        for viewset in (views.RecipeViewSet, views.TagsViewSet):
+            view = viewset(
+                request=request, action="list", format_kwarg=None, kwargs={}
+            )
+            paginator = view.pagination_class()
+            ordering = paginator.get_ordering(view)
+            queryset = view.get_queryset().order_by(*ordering)
+            yield viewset.__name__, queryset[: paginator.page_size + 1]
+
+        tag = Tags.objects.filter(user=user).first()
+        if tag is not None:
+            yield "recipes by tag", Recipe.tags.through.objects.filter(
+                tags_id=tag.id
+            ).values("recipe_id")
+
+    def explain(self, queryset, options):
+        """Return the query plan for the queryset"""
+        explain_options = {}
+        if options["analyze"]:
+            explain_options["analyze"] = True
+
+        if connection.vendor != "postgresql" or options["allow_seqscan"]:
+            return queryset.explain(**explain_options)
+
+        # With sequential scans disabled the planner only falls back to one
+        # when no usable index exists, even on a tiny development database.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain(**explain_options)
+
+    def find_sequential_scans(self, plan):
+        """Return the tables read by a full scan in the plan"""
+        tables = []
+        for line in plan.splitlines():
+            match = SEQ_SCAN_RE.search(line)
+            if match and "USING" not in line:
+                tables.append(match.group("table"))
+
+        return tables
+
+    def check_indexes(self):
+        """Report declared indexes that are missing from the database"""
+        expected = dict(THROUGH_INDEXES)
+        for model in (Recipe, Tags):
+            expected[model._meta.db_table] = [
+                index.name for index in model._meta.indexes
+            ]
+
+        problems = []
+        with connection.cursor() as cursor:
+            for table, names in expected.items():
+                existing = connection.introspection.get_constraints(
+                    cursor, table
+                )
+                for name in names:
+                    if name not in existing:
+                        problems.append(f"{table}: missing index {name}")
+
+        return problems
@@ -0,0 +1,61 @@
+"""
+Django command to render the OpenAPI schema ahead of time
+
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.utils import translation
+
+FORMATS = ["yaml", "json"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the YAML and JSON schema of the current code version to "
+        "API_SCHEMA_DIR, e.g. while building the image, and remove the "
+        "schemas of other versions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=getattr(settings, "API_SCHEMA_DIR", ""),
+            help="Directory to write to (default: API_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if not settings.ENABLE_API_DOCS:
+            raise CommandError("The API docs are disabled (ENABLE_API_DOCS)")
+        if not options["dir"]:
+            raise CommandError("No directory, set API_SCHEMA_DIR or --dir")
+
+        from core import schema
+
+        directory = Path(options["dir"])
+        directory.mkdir(parents=True, exist_ok=True)
+        names = set()
+        view = schema.CachedSchemaView.as_view()
+        factory = RequestFactory()
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts), translation.override(
+            settings.LANGUAGE_CODE
+        ):
+            for fmt in FORMATS:
+                response = view(factory.get("/api/schema/", {"format": fmt}))
+                if response.status_code != 200:
+                    raise CommandError(f"{fmt}: {response.status_code}")
+
+                name = schema.get_schema_name(
+                    None, fmt, translation.get_language()
+                )
+                (directory / name).write_bytes(response.content)
+                names.add(name)
+                self.stdout.write(f"Wrote {directory / name}")
+
+        for path in directory.iterdir():
+            if path.suffix[1:] in FORMATS and path.name not in names:
+                path.unlink()
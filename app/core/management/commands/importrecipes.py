@@ -0,0 +1,341 @@
+"""
+Django command to bulk import recipes and tags from NDJSON or CSV files
+
+"""
+import csv
+import io
+import itertools
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from core.models import Recipe, Tags
+from core.renderers import orjson
+from recipe.cache import bump_version
+from recipe.export import TAG_SEPARATOR
+
+RECIPE_COLUMNS = [
+    "id",
+    "user_id",
+    "title",
+    "time_minutes",
+    "price",
+    "description",
+]
+REQUIRED_FIELDS = ["title", "time_minutes", "price"]
+MAX_REPORTED_ERRORS = 20
+
+PRICE_FIELD = Recipe._meta.get_field("price")
+# Larger prices overflow the column and fail the whole batch on PostgreSQL.
+MAX_PRICE = Decimal(10) ** (
+    PRICE_FIELD.max_digits - PRICE_FIELD.decimal_places
+)
+MIN_MINUTES, MAX_MINUTES = BaseDatabaseOperations.integer_field_ranges[
+    "IntegerField"
+]
+
+
+def clean_value(value):
+    """Strip surrounding whitespace, blank strings count as missing"""
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+
+def copy_value(value):
+    """Escape a value for PostgreSQL's COPY text format"""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class Command(BaseCommand):
+    help = "Import recipes and tags from a large NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON or CSV file to import")
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "csv"],
+            help="File format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the owner for rows without a user column",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Write with COPY instead of INSERT (PostgreSQL only)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the rows committed by a previous interrupted run",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        path = options["path"]
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy requires a PostgreSQL database")
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        self.users = {}
+        self.tags = {}
+        self.errors = 0
+        self.use_copy = options["copy"]
+        self.default_email = options["user"]
+        checkpoint = f"{path}.progress"
+        done = self.read_checkpoint(checkpoint) if options["resume"] else 0
+
+        file_format = options["format"] or self.detect_format(path)
+        imported = 0
+        start = time.monotonic()
+        with open(path, newline="", encoding="utf-8") as stream:
+            records = self.read_records(stream, file_format)
+            records = itertools.islice(enumerate(records, 1), done, None)
+            while True:
+                batch = list(itertools.islice(records, options["batch_size"]))
+                if not batch:
+                    break
+
+                imported += self.import_batch(batch)
+                done = batch[-1][0]
+                self.write_checkpoint(checkpoint, done)
+
+                rate = imported / max(time.monotonic() - start, 1e-9)
+                self.stdout.write(
+                    f"{done} rows read, {imported} imported, "
+                    f"{self.errors} skipped ({rate:.0f} rows/s)"
+                )
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} recipes, skipped {self.errors} rows"
+            )
+        )
+
+    def detect_format(self, path):
+        if path.endswith(".csv"):
+            return "csv"
+        if path.endswith((".ndjson", ".jsonl")):
+            return "ndjson"
+        raise CommandError("Cannot detect the file format, pass --format")
+
+    def read_records(self, stream, file_format):
+        """Yield one dict per record, reading the file incrementally"""
+        if file_format == "csv":
+            yield from csv.DictReader(stream)
+            return
+
+        loads = orjson.loads if orjson is not None else json.loads
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                # Reported as an invalid row by parse_record.
+                yield None
+
+    def read_checkpoint(self, checkpoint):
+        if not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as stream:
+            return json.load(stream)["rows"]
+
+    def write_checkpoint(self, checkpoint, rows):
+        """Record the committed row count, atomically replacing the file"""
+        temporary = f"{checkpoint}.tmp"
+        with open(temporary, "w") as stream:
+            json.dump({"rows": rows}, stream)
+        os.replace(temporary, checkpoint)
+
+    def report_error(self, number, message):
+        self.errors += 1
+        if self.errors <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f"Row {number}: {message}")
+
+    def parse_record(self, number, record):
+        """Return the cleaned row, or None if it is invalid"""
+        if not isinstance(record, dict):
+            self.report_error(number, "not an object")
+            return None
+
+        # Empty CSV cells, short CSV rows and JSON nulls are all missing.
+        record = {key: clean_value(value) for key, value in record.items()}
+        missing = [
+            name for name in REQUIRED_FIELDS if record.get(name) is None
+        ]
+        if missing:
+            self.report_error(number, f"missing {', '.join(missing)}")
+            return None
+
+        try:
+            tags = record.get("tags") or []
+            if isinstance(tags, str):
+                tags = tags.split(TAG_SEPARATOR)
+            tags = [clean_value(str(tag)) for tag in tags if tag is not None]
+            row = {
+                "email": record.get("user") or self.default_email,
+                "title": str(record["title"])[:100],
+                "time_minutes": int(record["time_minutes"]),
+                "price": Decimal(str(record["price"])).quantize(
+                    Decimal("0.01")
+                ),
+                "description": record.get("description") or "",
+                "tags": [tag[:100] for tag in tags if tag],
+            }
+        except (
+            KeyError,
+            TypeError,
+            ValueError,
+            InvalidOperation,
+        ) as exc:
+            self.report_error(number, f"invalid value {exc!r}")
+            return None
+
+        if not row["email"]:
+            self.report_error(number, "no user, pass --user")
+            return None
+        if not row["price"].is_finite() or abs(row["price"]) >= MAX_PRICE:
+            self.report_error(number, f"price out of range {row['price']}")
+            return None
+        if not MIN_MINUTES <= row["time_minutes"] <= MAX_MINUTES:
+            self.report_error(
+                number, f"time_minutes out of range {row['time_minutes']}"
+            )
+            return None
+        return row
+
+    def import_batch(self, batch):
+        """Write one batch of records in a single transaction"""
+        rows = [self.parse_record(number, record) for number, record in batch]
+        self.resolve_users(row["email"] for row in rows if row)
+
+        valid = []
+        for (number, _), row in zip(batch, rows):
+            if row is None:
+                continue
+            if self.users[row["email"]] is None:
+                self.report_error(number, f"unknown user {row['email']}")
+                continue
+            row["user_id"] = self.users[row["email"]]
+            valid.append(row)
+
+        with transaction.atomic():
+            self.resolve_tags(valid)
+            if self.use_copy:
+                self.copy_recipes(valid)
+            else:
+                self.insert_recipes(valid)
+
+        for user_id in {row["user_id"] for row in valid}:
+            bump_version(user_id)
+        return len(valid)
+
+    def resolve_users(self, emails):
+        """Add the ids of not yet seen users to the lookup map"""
+        missing = set(emails) - set(self.users)
+        if missing:
+            users = get_user_model().objects.filter(email__in=missing)
+            # Unknown emails map to None so they are not queried again.
+            self.users.update(dict.fromkeys(missing))
+            self.users.update(users.values_list("email", "id"))
+
+    def resolve_tags(self, rows):
+        """Add the ids of the batch's tags to the map, creating missing"""
+        wanted = {
+            (row["user_id"], name) for row in rows for name in row["tags"]
+        }
+        missing = wanted - set(self.tags)
+        if not missing:
+            return
+
+        existing = Tags.objects.filter(
+            user_id__in={user_id for user_id, _ in missing},
+            name__in={name for _, name in missing},
+        ).order_by("id")
+        for tag_id, user_id, name in existing.values_list(
+            "id", "user_id", "name"
+        ):
+            if (user_id, name) in missing:
+                self.tags.setdefault((user_id, name), tag_id)
+
+        created = Tags.objects.bulk_create(
+            [
+                Tags(user_id=user_id, name=name)
+                for user_id, name in missing
+                if (user_id, name) not in self.tags
+            ]
+        )
+        for tag in created:
+            self.tags[(tag.user_id, tag.name)] = tag.id
+
+    def tag_links(self, rows, recipe_ids):
+        """Return (recipe_id, tag_id) pairs for the rows"""
+        return {
+            (recipe_id, self.tags[(row["user_id"], name)])
+            for row, recipe_id in zip(rows, recipe_ids)
+            for name in row["tags"]
+        }
+
+    def insert_recipes(self, rows):
+        columns = RECIPE_COLUMNS[1:]
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(**{c: row[c] for c in columns}) for row in rows]
+        )
+        through = Recipe.tags.through
+        through.objects.bulk_create(
+            [
+                through(recipe_id=recipe_id, tags_id=tag_id)
+                for recipe_id, tag_id in self.tag_links(
+                    rows, [recipe.id for recipe in recipes]
+                )
+            ]
+        )
+
+    def copy_recipes(self, rows):
+        """Stream the batch into the tables with COPY"""
+        with connection.cursor() as cursor:
+            # Reserve the ids up front so tag links can be written too.
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('core_recipe', 'id')) "
+                "FROM generate_series(1, %s)",
+                [len(rows)],
+            )
+            recipe_ids = [recipe_id for (recipe_id,) in cursor.fetchall()]
+
+            buffer = io.StringIO()
+            for row, recipe_id in zip(rows, recipe_ids):
+                values = [recipe_id] + [row[c] for c in RECIPE_COLUMNS[1:]]
+                buffer.write("\t".join(copy_value(v) for v in values) + "\n")
+            self.copy(cursor, "core_recipe", RECIPE_COLUMNS, buffer)
+
+            buffer = io.StringIO()
+            for recipe_id, tag_id in self.tag_links(rows, recipe_ids):
+                buffer.write(f"{recipe_id}\t{tag_id}\n")
+            self.copy(
+                cursor, "core_recipe_tags", ["recipe_id", "tags_id"], buffer
+            )
+
+    def copy(self, cursor, table, columns, buffer):
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer
+        )
@@ -0,0 +1,212 @@
+"""
+Django command to profile the cold start of the application
+
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: sets up Django with every AppConfig.ready()
+# timed, then serves one request through the WSGI handler.
+STARTUP_SCRIPT = """
+import io, json, sys, time
+start = time.perf_counter()
+import django
+from django.apps import AppConfig
+
+ready = {}
+create = AppConfig.create.__func__
+
+
+def timed_create(cls, entry):
+    config = create(cls, entry)
+    method = config.ready
+
+    def timed_ready():
+        began = time.perf_counter()
+        method()
+        ready[config.label] = time.perf_counter() - began
+
+    config.ready = timed_ready
+    return config
+
+
+AppConfig.create = classmethod(timed_create)
+django.setup()
+setup = time.perf_counter() - start
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+settings.ALLOWED_HOSTS = ["*"]
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": sys.argv[1],
+    "QUERY_STRING": "",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80",
+    "wsgi.input": io.BytesIO(),
+    "wsgi.url_scheme": "http",
+}
+status = []
+response = WSGIHandler()(environ, lambda line, headers: status.append(line))
+b"".join(response)
+response.close()
+print(json.dumps({
+    "setup": setup,
+    "first_response": time.perf_counter() - start,
+    "ready": ready,
+    "status": status[0],
+}))
+"""
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+LEAN_PROFILE = {"ENABLE_API_DOCS": "0", "ENABLE_ADMIN": "0"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the import cost per module, the AppConfig.ready() times "
+        "and the time to the first response, with the current settings "
+        "and with the API docs and admin disabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/recipe/tags/",
+            help="URL of the first request",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        current = {
+            "ENABLE_API_DOCS": "1" if settings.ENABLE_API_DOCS else "0",
+            "ENABLE_ADMIN": "1" if settings.ENABLE_ADMIN else "0",
+        }
+        profiles = {"current": current, "lean": LEAN_PROFILE}
+
+        imports = self.profile_imports(current, options["path"])
+        results = {
+            "imports": {
+                "packages": self.top(imports["packages"], options["top"]),
+                "modules": self.top(imports["modules"], options["top"]),
+            },
+            "profiles": [],
+        }
+        for name, env in profiles.items():
+            runs = [
+                self.run_startup(env, options["path"])
+                for _ in range(options["repeat"])
+            ]
+            results["profiles"].append(self.summarize(name, env, runs))
+
+        self.report(results, options["json"])
+
+    def run_child(self, env, path, *flags):
+        """Run the startup script in a new interpreter"""
+        result = subprocess.run(
+            [sys.executable, *flags, "-c", STARTUP_SCRIPT, path],
+            env={**os.environ, **env},
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return result
+
+    def run_startup(self, env, path):
+        result = self.run_child(env, path)
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def profile_imports(self, env, path):
+        """Aggregate the -X importtime output of one cold start"""
+        result = self.run_child(env, path, "-X", "importtime")
+        packages = defaultdict(int)
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if not match:
+                continue
+            own, cumulative, module = match.groups()
+            packages[module.split(".")[0]] += int(own)
+            modules[module] = int(cumulative)
+        return {"packages": packages, "modules": modules}
+
+    def top(self, costs, count):
+        """Return the most expensive entries, in milliseconds"""
+        ranked = sorted(costs.items(), key=lambda item: -item[1])
+        return [
+            {"name": name, "ms": round(us / 1000, 2)}
+            for name, us in ranked[:count]
+        ]
+
+    def summarize(self, name, env, runs):
+        ready = defaultdict(list)
+        for run in runs:
+            for label, seconds in run["ready"].items():
+                ready[label].append(seconds)
+
+        def median_ms(values):
+            return round(statistics.median(values) * 1000, 2)
+
+        return {
+            "profile": name,
+            "env": env,
+            "status": runs[0]["status"],
+            "setup_ms": median_ms([run["setup"] for run in runs]),
+            "first_response_ms": median_ms(
+                [run["first_response"] for run in runs]
+            ),
+            "ready_ms": {
+                label: median_ms(values) for label, values in ready.items()
+            },
+        }
+
+    def report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for title, key in [
+            ("Self import time per package (ms)", "packages"),
+            ("Cumulative import time per module (ms)", "modules"),
+        ]:
+            self.stdout.write(title)
+            for row in results["imports"][key]:
+                self.stdout.write(f"  {row['name']:<50} {row['ms']:>9.2f}")
+
+        for profile in results["profiles"]:
+            flags = " ".join(f"{k}={v}" for k, v in profile["env"].items())
+            self.stdout.write(f"\nProfile {profile['profile']}, {flags} (ms)")
+            status = profile["status"]
+            rows = [
+                ("django.setup()", profile["setup_ms"]),
+                (f"first response ({status})", profile["first_response_ms"]),
+            ]
+            rows += [
+                (f"{label}.ready()", ms)
+                for label, ms in profile["ready_ms"].items()
+            ]
+            for label, ms in rows:
+                self.stdout.write(f"  {label:<50} {ms:>9.2f}")
+
+        current, lean = (p["first_response_ms"] for p in results["profiles"])
+        if current:
+            saved = current - lean
+            self.stdout.write(
+                f"\nlean profile: {saved:.2f} ms faster to the first "
+                f"response ({saved / current:.0%})"
+            )
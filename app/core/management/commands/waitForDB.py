@@ -2,25 +2,107 @@
 Django command to wait for the database to be available
 
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+import random
 import time
 
 
 class Command(BaseCommand):
+    help = "Wait until the databases accept connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            action="append",
+            dest="databases",
+            help="Database alias to wait for, repeatable (default: default)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait before failing, 0 waits forever",
+        )
+        parser.add_argument(
+            "--initial-interval",
+            type=float,
+            default=0.005,
+            help="Seconds before the first retry, doubled on each retry",
+        )
+        parser.add_argument(
+            "--max-interval",
+            type=float,
+            default=1.0,
+            help="Longest pause between two probes, in seconds",
+        )
+
     def handle(self, *args, **options):
         """Entrypoint for command"""
+        aliases = options["databases"] or [DEFAULT_DB_ALIAS]
+        unknown = [alias for alias in aliases if alias not in connections]
+        if unknown:
+            raise CommandError(f"Unknown database: {', '.join(unknown)}")
+
         self.stdout.write("Waiting for database...")
-        db_up = False
-        while db_up is False:
+        deadline = None
+        if options["timeout"]:
+            deadline = time.monotonic() + options["timeout"]
+
+        # Each alias is probed on its own thread, with its own connection.
+        with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+            available = list(
+                executor.map(
+                    lambda alias: self.wait_for(alias, deadline, options),
+                    aliases,
+                )
+            )
+
+        down = [alias for alias, up in zip(aliases, available) if not up]
+        if down:
+            raise CommandError(
+                f"Timed out waiting for database: {', '.join(down)}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Database available!"))
+
+    def wait_for(self, alias, deadline, options):
+        """Probe a database until it is up, return False on timeout"""
+        attempt = 0
+        while True:
             try:
-                self.check(databases=["default"])
-                db_up = True
+                self.probe(alias)
+                return True
             except (Psycopg2OpError, OperationalError):
-                self.stdout.write("Database unavailable...")
-                time.sleep(1)
+                pass
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
+            # Equal jitter: the pause still grows, but containers started
+            # together do not all retry at the same moment.
+            interval = min(
+                options["max_interval"],
+                options["initial_interval"] * 2 ** min(attempt, 32),
+            )
+            delay = interval / 2 + random.uniform(0, interval / 2)
+            attempt += 1
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+
+            self.stdout.write(f"Database {alias} unavailable...")
+            time.sleep(delay)
+
+    def probe(self, alias):
+        """Open and close a connection, raising if the database is down"""
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+        finally:
+            connection.close()
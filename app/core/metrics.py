@@ -0,0 +1,259 @@
+"""
+Prometheus metrics shared by the worker processes
+
+Each process counts in memory and, when METRICS_DIR is set, a background
+thread writes its totals to a file of its own in that directory every
+METRICS_FLUSH_SECONDS. A scrape, served by whichever process gets it, adds
+up the files of every process. The directory should be emptied when the
+service starts, like prometheus_client's PROMETHEUS_MULTIPROC_DIR.
+"""
+import atexit
+import bisect
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger("core.metrics")
+
+# Upper bounds of the request duration buckets, in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name: (type, help)
+METRICS = {
+    "http_requests_total": (
+        "counter",
+        "Requests handled, by method, route and status code.",
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "Time to respond to requests, by method and route.",
+    ),
+    "db_queries_total": ("counter", "SQL queries run, by database."),
+    "db_connections_opened_total": (
+        "counter",
+        "Database connections opened, by database.",
+    ),
+    "cache_requests_total": (
+        "counter",
+        "Cache lookups by cache and result, for hit ratios.",
+    ),
+    "auth_failures_total": (
+        "counter",
+        "Rejected token authentications and logins, by reason.",
+    ),
+}
+
+
+class Registry:
+    """Counters and histograms of this process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Also runs in forked children, which must not report the parent's
+        # counts as their own. They get a new lock too, the parent's may
+        # have been held by its flusher thread at the time of the fork.
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.filename = f"metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+        self.flusher = None
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        if self.flusher is None:
+            self.start_flusher()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        bucket = bisect.bisect_left(DURATION_BUCKETS, value)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    "buckets": [0] * (len(DURATION_BUCKETS) + 1),
+                    "sum": 0.0,
+                }
+            histogram["buckets"][bucket] += 1
+            histogram["sum"] += value
+        if self.flusher is None:
+            self.start_flusher()
+
+    def record_request(self, method, route, status, duration):
+        """Count one response and its duration"""
+        self.inc(
+            "http_requests_total", method=method, route=route, status=status
+        )
+        self.observe(
+            "http_request_duration_seconds",
+            duration,
+            method=method,
+            route=route,
+        )
+
+    def snapshot(self):
+        """Return the samples in the format of the flushed files"""
+        with self.lock:
+            counters = [
+                [name, list(labels), value]
+                for (name, labels), value in self.counters.items()
+            ]
+            histograms = [
+                [name, list(labels), list(data["buckets"]), data["sum"]]
+                for (name, labels), data in self.histograms.items()
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def start_flusher(self):
+        with self.lock:
+            if self.flusher is not None:
+                return
+            self.flusher = threading.Thread(
+                target=self.flush_forever, name="metrics-flusher", daemon=True
+            )
+        # Without a directory there is nothing to flush to, the thread is
+        # only a marker.
+        if get_directory():
+            self.flusher.start()
+
+    def flush_forever(self):
+        interval = getattr(settings, "METRICS_FLUSH_SECONDS", 5)
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self):
+        """Write this process's totals to the metrics directory"""
+        directory = get_directory()
+        if not directory:
+            return
+
+        data = json.dumps(self.snapshot())
+        temporary = None
+        try:
+            descriptor, temporary = tempfile.mkstemp(
+                dir=directory, suffix=".tmp"
+            )
+            with os.fdopen(descriptor, "w") as output:
+                output.write(data)
+            # Readers only ever see complete files.
+            os.replace(temporary, os.path.join(directory, self.filename))
+        except OSError:
+            logger.exception("Could not flush the metrics to %s", directory)
+            if temporary and os.path.exists(temporary):
+                os.unlink(temporary)
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+record_request = registry.record_request
+
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush)
+
+
+def get_directory():
+    return getattr(settings, "METRICS_DIR", "")
+
+
+def collect():
+    """Add up the samples of every process flushed to METRICS_DIR"""
+    counters = {}
+    histograms = {}
+
+    def merge(data):
+        for name, labels, value in data["counters"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, total in data["histograms"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.setdefault(
+                key, {"buckets": [0] * len(buckets), "sum": 0.0}
+            )
+            for index, count in enumerate(buckets):
+                merged["buckets"][index] += count
+            merged["sum"] += total
+
+    directory = get_directory()
+    if directory:
+        own = os.path.join(directory, registry.filename)
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            # This process's file lags behind its memory.
+            if path == own:
+                continue
+            try:
+                with open(path) as source:
+                    merge(json.load(source))
+            except (OSError, ValueError):
+                continue
+
+    merge(registry.snapshot())
+    return counters, histograms
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = [
+        (
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels
+    ]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render():
+    """Return the metrics in the Prometheus text exposition format"""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            continue
+
+        for (metric, labels), data in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            bounds = [*DURATION_BUCKETS, "+Inf"]
+            for bound, count in zip(bounds, data["buckets"]):
+                cumulative += count
+                bucket_labels = format_labels(labels + (("le", bound),))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {data['sum']}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper counting every SQL query"""
+    registry.inc("db_queries_total", database=context["connection"].alias)
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Add count_query to every database connection, on connection_created"""
+    registry.inc("db_connections_opened_total", database=connection.alias)
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
@@ -0,0 +1,267 @@
+"""
+Per-request performance instrumentation
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from core import metrics, timing
+
+logger = logging.getLogger("core.performance")
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Server-Timing order; phases the request did not go through are left out.
+PHASES = ("total", "view", "auth", "db", "serialize", "render")
+
+
+class RouteHistogram:
+    """
+    Latencies of one route over the last PERFORMANCE_WINDOW_SECONDS.
+
+    The window is split in ten slots, each with its own bucket counts, and
+    slots are dropped as they fall out of the window.
+    """
+
+    def __init__(self):
+        self.slots = {}
+
+    def get_slot_seconds(self):
+        window = getattr(settings, "PERFORMANCE_WINDOW_SECONDS", 300)
+        return max(1, window // 10)
+
+    def record(self, now, duration_ms, sql_count):
+        slot_seconds = self.get_slot_seconds()
+        index = int(now // slot_seconds)
+        slot = self.slots.get(index)
+        if slot is None:
+            for old in [key for key in self.slots if key <= index - 10]:
+                del self.slots[old]
+            slot = self.slots[index] = {
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+                "count": 0,
+                "sum_ms": 0.0,
+                "max_ms": 0.0,
+                "sql": 0,
+            }
+
+        bucket = len(BUCKETS_MS)
+        for position, bound in enumerate(BUCKETS_MS):
+            if duration_ms <= bound:
+                bucket = position
+                break
+        slot["buckets"][bucket] += 1
+        slot["count"] += 1
+        slot["sum_ms"] += duration_ms
+        slot["max_ms"] = max(slot["max_ms"], duration_ms)
+        slot["sql"] += sql_count
+
+    def snapshot(self, now):
+        """Return the statistics of the slots still in the window"""
+        first = int(now // self.get_slot_seconds()) - 9
+        slots = [slot for key, slot in self.slots.items() if key >= first]
+        buckets = [
+            sum(counts) for counts in zip(*[s["buckets"] for s in slots])
+        ]
+        count = sum(slot["count"] for slot in slots)
+        if not count:
+            return None
+
+        max_ms = max(slot["max_ms"] for slot in slots)
+        return {
+            "count": count,
+            "mean_ms": sum(slot["sum_ms"] for slot in slots) / count,
+            "p50_ms": self.percentile(buckets, count, 50, max_ms),
+            "p95_ms": self.percentile(buckets, count, 95, max_ms),
+            "p99_ms": self.percentile(buckets, count, 99, max_ms),
+            "max_ms": max_ms,
+            "sql_per_request": sum(slot["sql"] for slot in slots) / count,
+            "buckets": {
+                **{f"le_{bound}": n for bound, n in zip(BUCKETS_MS, buckets)},
+                "overflow": buckets[-1],
+            },
+        }
+
+    def percentile(self, buckets, count, percent, max_ms):
+        """Return the upper bound of the bucket holding the percentile"""
+        rank = percent / 100 * count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, max_ms)
+        return max_ms
+
+
+histograms = {}
+histograms_lock = threading.Lock()
+
+
+def record_route(route, duration_ms, sql_count):
+    now = time.time()
+    with histograms_lock:
+        histogram = histograms.get(route)
+        if histogram is None:
+            histogram = histograms[route] = RouteHistogram()
+        histogram.record(now, duration_ms, sql_count)
+
+
+def get_route_stats():
+    """Return the rolling statistics of every route seen by this process"""
+    now = time.time()
+    with histograms_lock:
+        stats = {
+            route: histogram.snapshot(now)
+            for route, histogram in histograms.items()
+        }
+    return {route: data for route, data in stats.items() if data}
+
+
+def get_route_name(request):
+    """Return the URL name of the request, to keep the cardinality low"""
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.view_name:
+        return "unmatched"
+    return match.view_name
+
+
+def get_route(request):
+    return f"{request.method} {get_route_name(request)}"
+
+
+class PerformanceMiddleware:
+    """
+    Time the SQL, auth, view, serializer and render phases of requests.
+
+    Every request is counted in core.metrics, with its duration. A
+    PERFORMANCE_SAMPLE_RATE share is also timed phase by phase; those get a
+    Server-Timing header (unless PERFORMANCE_SERVER_TIMING is off), a JSON
+    log line on the core.performance logger and are added to the route's
+    histogram. Durations in the view phase exclude rendering, and
+    streamed bodies are not timed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django would run a sync process_view in a thread.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        timings = self.start()
+        if timings is None:
+            response = self.get_response(request)
+        else:
+            token = timing.current.set(timings)
+            try:
+                response = self.get_response(request)
+            finally:
+                timing.current.reset(token)
+
+        self.finish(request, response, started, timings)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timings = self.start()
+        if timings is None:
+            response = await self.get_response(request)
+        else:
+            token = timing.current.set(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                timing.current.reset(token)
+
+        self.finish(request, response, started, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.mark_view_started()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Not self.process_view, __init__ points it here in async mode.
+        self.mark_view_started()
+
+    def mark_view_started(self):
+        timings = timing.current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    def start(self):
+        """Return the timings of a sampled request, None otherwise"""
+        rate = getattr(settings, "PERFORMANCE_SAMPLE_RATE", 1.0)
+        if rate < 1 and random.random() >= rate:
+            return None
+        return timing.RequestTimings()
+
+    def finish(self, request, response, started, timings):
+        end = time.perf_counter()
+        metrics.record_request(
+            request.method,
+            get_route_name(request),
+            str(response.status_code),
+            end - started,
+        )
+        if timings is None:
+            return
+
+        phases = dict(timings.phases)
+        phases["total"] = end - timings.started
+        if timings.view_started is not None:
+            phases["view"] = (
+                end - timings.view_started - phases.get("render", 0.0)
+            )
+        if timings.sql_count:
+            phases["db"] = timings.sql_time
+
+        route = get_route(request)
+        record_route(route, phases["total"] * 1000, timings.sql_count)
+
+        if getattr(settings, "PERFORMANCE_SERVER_TIMING", True):
+            response["Server-Timing"] = self.format_header(phases, timings)
+
+        # Skip building the line when no handler would take it.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                json.dumps(
+                    {
+                        "route": route,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "sql_count": timings.sql_count,
+                        **{
+                            f"{name}_ms": round(phases[name] * 1000, 3)
+                            for name in PHASES
+                            if name in phases
+                        },
+                    }
+                )
+            )
+
+    def format_header(self, phases, timings):
+        metrics = []
+        for name in PHASES:
+            if name not in phases:
+                continue
+            metric = f"{name};dur={phases[name] * 1000:.3f}"
+            if name == "db":
+                noun = "query" if timings.sql_count == 1 else "queries"
+                metric += f';desc="{timings.sql_count} {noun}"'
+            metrics.append(metric)
+        return ", ".join(metrics)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_recipe_tags"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "-id"], name="core_recipe_user_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tags",
+            index=models.Index(
+                fields=["user", "name", "id"], name="core_tags_user_name_idx"
+            ),
+        ),
+        # The implicit through table only indexes (recipe_id, tags_id), so
+        # looking up recipes by tag needs the reverse composite index.
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX core_recipe_tags_tags_recipe_idx "
+                "ON core_recipe_tags (tags_id, recipe_id)"
+            ),
+            reverse_sql="DROP INDEX core_recipe_tags_tags_recipe_idx",
+        ),
+    ]
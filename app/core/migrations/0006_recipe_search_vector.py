@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:31
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_SEARCH = """
+CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(
+            to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A'
+        ) ||
+        setweight(
+            to_tsvector('pg_catalog.english', coalesce(NEW.description, '')),
+            'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, search_vector
+    ON core_recipe
+    FOR EACH ROW EXECUTE FUNCTION core_recipe_search_vector_update();
+
+UPDATE core_recipe SET title = title;
+
+CREATE INDEX core_recipe_search_idx ON core_recipe USING gin (search_vector);
+"""
+
+DROP_SEARCH = """
+DROP INDEX IF EXISTS core_recipe_search_idx;
+DROP TRIGGER IF EXISTS core_recipe_search_vector_trigger ON core_recipe;
+DROP FUNCTION IF EXISTS core_recipe_search_vector_update();
+"""
+
+
+def create_search(apps, schema_editor):
+    """Maintain the search vector and its GIN index on PostgreSQL"""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -2,6 +2,7 @@
 Database models.
 """
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -59,6 +60,22 @@ class Recipe(models.Model):
     price = models.DecimalField(max_digits=7, decimal_places=2)
     description = models.TextField(blank=True)
     tags = models.ManyToManyField("Tags")
+    # Maintained by a database trigger on PostgreSQL, unused elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-id"], name="core_recipe_user_id_idx"
+            ),
+            models.Index(
+                fields=["user", "price"], name="core_recipe_user_price_idx"
+            ),
+            models.Index(
+                fields=["user", "time_minutes"],
+                name="core_recipe_user_time_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -73,5 +90,12 @@ class Tags(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "name", "id"], name="core_tags_user_name_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name
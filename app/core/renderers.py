@@ -0,0 +1,65 @@
+"""
+JSON renderer backed by orjson, falling back to the standard library
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from core.timing import measure
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Datetimes go through DRF's encoder so their format does not change.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson is not None
+    else 0
+)
+
+_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Render JSON with orjson when it is installed.
+
+    The output is byte-identical to JSONRenderer for compact, unicode
+    responses: Decimal, lazy translation strings and other types orjson
+    does not know are handed to DRF's JSONEncoder.default. Indented output,
+    ASCII-only output and values orjson rejects (such as integers over 64
+    bits) use the standard library renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("render"):
+            return self.render_json(
+                data, accepted_media_type, renderer_context
+            )
+
+    def render_json(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            orjson is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=_encoder.default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict javascript subset, as JSONRenderer does.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,51 @@
+"""
+Read replica routing for API views
+"""
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+from myproject.dbRouter import (
+    get_replicas,
+    is_pinned,
+    pin_to_primary,
+    use_replica,
+)
+
+
+class ReplicaReadsMixin:
+    """
+    Send the reads of safe requests to the replicas.
+
+    Authentication still reads from the primary. After a successful write
+    the user is pinned to the primary for DB_REPLICA_PIN_SECONDS, so they
+    see their own changes even while the replicas catch up.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = use_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            use_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.route_reads(request)
+
+    def route_reads(self, request):
+        """Use the replicas for the rest of the request, if safe"""
+        if request.method not in SAFE_METHODS or not get_replicas():
+            return
+        if not is_pinned(request.user.pk):
+            use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and status.is_success(response.status_code)
+            and get_replicas()
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user.pk)
+
+        return super().finalize_response(request, response, *args, **kwargs)
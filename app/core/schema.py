@@ -0,0 +1,127 @@
+"""
+OpenAPI schema rendered once per code version
+"""
+import functools
+import hashlib
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.views import SpectacularAPIView
+
+# Schemas already loaded by this process, by schema name.
+schemas = {}
+
+
+@functools.lru_cache(maxsize=None)
+def hash_sources():
+    """Return a hash of the project sources and the schema libraries"""
+    digest = hashlib.sha256()
+    for library in (django, rest_framework, drf_spectacular):
+        digest.update(library.__version__.encode())
+    for path in sorted(Path(settings.BASE_DIR).rglob("*.py")):
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def get_code_version():
+    """Return CODE_VERSION, or a hash of the code when it is not set"""
+    return getattr(settings, "CODE_VERSION", "") or hash_sources()
+
+
+def get_schema_name(api_version, fmt, lang):
+    return f"{get_code_version()}-{api_version or 'default'}-{lang}.{fmt}"
+
+
+def get_cache():
+    return caches[getattr(settings, "API_SCHEMA_CACHE_ALIAS", "default")]
+
+
+def get_schema_path(name):
+    """Return where generateSchema stores a schema, None if disabled"""
+    directory = getattr(settings, "API_SCHEMA_DIR", "")
+    return Path(directory, name) if directory else None
+
+
+def make_etag(content):
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def load_schema(name):
+    """Return the ETag and content of a stored schema, or None"""
+    if name in schemas:
+        return schemas[name]
+
+    schema = get_cache().get(f"openapi:{name}")
+    if schema is None:
+        path = get_schema_path(name)
+        if path is None or not path.is_file():
+            return None
+        content = path.read_bytes()
+        schema = (make_etag(content), content)
+
+    schemas[name] = schema
+    return schema
+
+
+def store_schema(name, content):
+    """Share a freshly rendered schema with the other processes"""
+    schema = (make_etag(content), content)
+    get_cache().set(f"openapi:{name}", schema, timeout=None)
+    schemas[name] = schema
+    return schema
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    Serve the schema without introspecting the API on every request.
+
+    The rendered schema is looked up in memory, the cache and the files
+    written by `manage.py generateSchema`, and only generated when missing.
+    Its name holds the code version, so a deploy brings a new schema.
+    """
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version
+            or request.version
+            or self._get_version_parameter(request)
+        )
+        renderer = request.accepted_renderer
+        name = get_schema_name(
+            version, renderer.format, translation.get_language()
+        )
+        schema = load_schema(name)
+        if schema is None:
+            response = super()._get_schema_response(request)
+            content = renderer.render(
+                response.data,
+                renderer.media_type,
+                self.get_renderer_context(),
+            )
+            schema = store_schema(name, content)
+
+        etag, content = schema
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in [tag.removeprefix("W/") for tag in etags]:
+            response = HttpResponse(status=304)
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f"; charset={renderer.charset}"
+            response = HttpResponse(content, content_type=content_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
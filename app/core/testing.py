@@ -0,0 +1,84 @@
+"""
+Query count and latency budgets for API tests
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def format_queries(queries):
+    """Return the captured SQL, with the statements that repeat first"""
+    shapes = Counter(LITERALS.sub("?", query["sql"]) for query in queries)
+    lines = [
+        f"Repeated {count} times: {shape}"
+        for shape, count in shapes.most_common()
+        if count > 1
+    ]
+    lines += [
+        f"{index}. ({query['time']}s) {query['sql']}"
+        for index, query in enumerate(queries, 1)
+    ]
+    return "\n".join(lines)
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting how many queries and how long an API call takes.
+
+    The time budgets are multiplied by QUERY_BUDGET_TIME_FACTOR, to give a
+    slow CI machine more room, and are not checked when it is 0.
+    """
+
+    dataset_sizes = (1, 100, 10000)
+
+    @contextmanager
+    def assertQueryBudget(
+        self, max_queries, max_seconds=None, using=DEFAULT_DB_ALIAS
+    ):
+        """Fail if the block runs more queries or takes longer"""
+        with CaptureQueriesContext(connections[using]) as queries:
+            start = time.perf_counter()
+            yield queries
+            elapsed = time.perf_counter() - start
+
+        if len(queries) > max_queries:
+            self.fail(
+                f"{len(queries)} queries, the budget is {max_queries}\n"
+                f"{format_queries(queries)}"
+            )
+
+        factor = getattr(settings, "QUERY_BUDGET_TIME_FACTOR", 1)
+        if max_seconds is not None and factor:
+            if elapsed > max_seconds * factor:
+                self.fail(
+                    f"Took {elapsed:.3f}s, the budget is "
+                    f"{max_seconds * factor:.3f}s\n{format_queries(queries)}"
+                )
+
+    def assertConstantQueries(
+        self, prepare, call, max_queries, max_seconds=None, sizes=None
+    ):
+        """
+        Check the budget of an API call for every dataset size.
+
+        prepare(size) sets up a dataset of that size and returns what
+        call() needs. The query count must be the same for every size.
+        """
+        captured = {}
+        for size in sizes or self.dataset_sizes:
+            with self.subTest(size=size):
+                data = prepare(size)
+                with self.assertQueryBudget(max_queries, max_seconds) as qs:
+                    captured[size] = qs
+                    call(data)
+
+        counts = {size: len(queries) for size, queries in captured.items()}
+        if len(set(counts.values())) > 1:
+            self.fail(f"The query count grows with the data: {counts}")
@@ -1,31 +1,289 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 
+from core.models import Recipe, Tags
 
-@patch("core.management.commands.waitForDB.Command.check")
+
+@patch("core.management.commands.waitForDB.Command.probe")
 class CommandTests(SimpleTestCase):
     """Test commands"""
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_probe):
         """Test waiting for database if database is ready"""
-        patched_check.return_value = True
+        patched_probe.return_value = None
 
-        call_command("waitForDB")
+        call_command("waitForDB", stdout=StringIO())
 
-        patched_check.assert_called_once_with(databases=["default"])
+        patched_probe.assert_called_once_with("default")
 
     @patch("time.sleep")
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_probe):
         """Test waiting for database when getting OperationalError"""
 
-        patched_check.side_effect = (
-            [Psycopg2Error] * 2 + [OperationalError] * 3 + [True]
+        patched_probe.side_effect = (
+            [Psycopg2Error] * 2 + [OperationalError] * 3 + [None]
+        )
+
+        call_command("waitForDB", stdout=StringIO())
+
+        self.assertEqual(patched_probe.call_count, 6)
+        patched_probe.assert_called_with("default")
+
+    @patch("time.sleep")
+    def test_wait_for_db_backoff(self, patched_sleep, patched_probe):
+        """Test the pause doubles from the initial to the max interval"""
+        patched_probe.side_effect = [OperationalError] * 6 + [None]
+
+        call_command(
+            "waitForDB",
+            initial_interval=0.01,
+            max_interval=0.1,
+            stdout=StringIO(),
+        )
+
+        delays = [call.args[0] for call in patched_sleep.call_args_list]
+        for delay, interval in zip(delays, [0.01, 0.02, 0.04, 0.08, 0.1]):
+            self.assertGreaterEqual(delay, interval / 2)
+            self.assertLessEqual(delay, interval)
+
+    def test_wait_for_db_timeout(self, patched_probe):
+        """Test the command fails once the timeout has passed"""
+        patched_probe.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "waitForDB", timeout=0.05, max_interval=0.01, stdout=StringIO()
+            )
+
+    def test_wait_for_several_databases(self, patched_probe):
+        """Test every alias given is probed"""
+        patched_probe.return_value = None
+
+        call_command(
+            "waitForDB",
+            "--database=default",
+            "--database=default",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(patched_probe.call_count, 2)
+
+    def test_wait_for_unknown_database(self, patched_probe):
+        """Test unknown aliases are rejected"""
+        with self.assertRaises(CommandError):
+            call_command("waitForDB", database=["missing"])
+
+
+class ExplainQueriesTests(TestCase):
+    """Test the explainQueries command"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "explain@example.com", "testpass123"
+        )
+        tag = Tags.objects.create(user=self.user, name="Vegan")
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample",
+            time_minutes=5,
+            price=Decimal("1.00"),
+        )
+        recipe.tags.add(tag)
+
+    def test_explain_reports_plans(self):
+        """Test each list queryset is explained"""
+        out = StringIO()
+
+        call_command("explainQueries", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("RecipeViewSet", output)
+        self.assertIn("TagsViewSet", output)
+        self.assertIn("recipes by tag", output)
+        self.assertNotIn("missing index", output)
+
+    def test_explain_without_users(self):
+        """Test the command fails when there is no user to explain for"""
+        with self.assertRaises(CommandError):
+            call_command("explainQueries", email="nobody@example.com")
+
+
+class ImportRecipesTests(TestCase):
+    """Test the importrecipes command"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "importer@example.com", "testpass123"
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        return path
+
+    def test_import_ndjson(self):
+        """Test NDJSON rows are imported with users and tags resolved"""
+        Tags.objects.create(user=self.user, name="Vegan")
+        rows = [
+            {
+                "user": self.user.email,
+                "title": f"Recipe {index}",
+                "time_minutes": index,
+                "price": "2.5",
+                "tags": ["Vegan", "Quick"],
+            }
+            for index in range(5)
+        ]
+        path = self.write_file(
+            "recipes.ndjson", "\n".join(json.dumps(row) for row in rows)
+        )
+
+        call_command("importrecipes", path, batch_size=2, stdout=StringIO())
+
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 5)
+        self.assertEqual(Tags.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(recipes.first().price, Decimal("2.50"))
+        for recipe in recipes:
+            self.assertEqual(recipe.tags.count(), 2)
+        self.assertFalse(os.path.exists(f"{path}.progress"))
+
+    def test_import_csv_with_default_user(self):
+        """Test CSV exports can be imported for a given user"""
+        path = self.write_file(
+            "recipes.csv",
+            "id,title,time_minutes,price,description,tags\r\n"
+            '1,Soup,10,1.00,"Hot, spicy",Dinner|Vegan\r\n',
+        )
+
+        call_command(
+            "importrecipes", path, user=self.user.email, stdout=StringIO()
+        )
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.description, "Hot, spicy")
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Dinner", "Vegan"],
+        )
+
+    def test_invalid_rows_skipped(self):
+        """Test invalid rows and unknown users are reported and skipped"""
+        path = self.write_file(
+            "recipes.ndjson",
+            "{not json}\n"
+            '{"user": "nobody@example.com", "title": "A",'
+            ' "time_minutes": 1, "price": "1"}\n'
+            '{"user": "importer@example.com", "title": "B",'
+            ' "time_minutes": "x", "price": "1"}\n'
+            '{"user": "importer@example.com", "title": "C",'
+            ' "time_minutes": 1, "price": "1"}\n',
+        )
+        out = StringIO()
+
+        call_command("importrecipes", path, stdout=out, stderr=StringIO())
+
+        self.assertEqual(
+            list(Recipe.objects.values_list("title", flat=True)), ["C"]
+        )
+        self.assertIn("skipped 3 rows", out.getvalue())
+
+    def test_out_of_range_rows_skipped(self):
+        """Test values the recipe columns cannot hold are skipped"""
+        rows = [
+            {"title": "Pricey", "time_minutes": 1, "price": "123456.78"},
+            {"title": "NaN", "time_minutes": 1, "price": "NaN"},
+            {"title": "Slow", "time_minutes": 2**31, "price": "1"},
+            {"title": "Fine", "time_minutes": 1, "price": "99999.99"},
+        ]
+        path = self.write_file(
+            "recipes.ndjson", "\n".join(json.dumps(row) for row in rows)
+        )
+        out = StringIO()
+
+        call_command(
+            "importrecipes",
+            path,
+            user=self.user.email,
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Recipe.objects.values_list("title", flat=True)), ["Fine"]
+        )
+        self.assertIn("skipped 3 rows", out.getvalue())
+
+    def test_blank_values_normalised(self):
+        """Test blank cells count as missing and tag names are stripped"""
+        path = self.write_file(
+            "recipes.csv",
+            "title,time_minutes,price,tags\r\n"
+            ",10,1.00,Dinner\r\n"
+            "Short,10\r\n"
+            "  Soup ,10,1.00, Dinner | Vegan ||\r\n",
+        )
+        out = StringIO()
+
+        call_command(
+            "importrecipes",
+            path,
+            user=self.user.email,
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.title, "Soup")
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Dinner", "Vegan"],
+        )
+        self.assertIn("skipped 2 rows", out.getvalue())
+
+    def test_resume_skips_committed_rows(self):
+        """Test --resume continues after the checkpointed rows"""
+        rows = [
+            {"title": f"Recipe {index}", "time_minutes": 1, "price": "1"}
+            for index in range(4)
+        ]
+        path = self.write_file(
+            "recipes.ndjson", "\n".join(json.dumps(row) for row in rows)
+        )
+        self.write_file("recipes.ndjson.progress", '{"rows": 3}')
+
+        call_command(
+            "importrecipes",
+            path,
+            user=self.user.email,
+            resume=True,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Recipe.objects.values_list("title", flat=True)),
+            ["Recipe 3"],
         )
 
-        call_command("waitForDB")
+    def test_copy_requires_postgres(self):
+        """Test --copy is refused on other databases"""
+        path = self.write_file("recipes.ndjson", "")
+        if connection.vendor == "postgresql":
+            self.skipTest("COPY is available")
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=["default"])
+        with self.assertRaises(CommandError):
+            call_command("importrecipes", path, copy=True)
@@ -0,0 +1,149 @@
+"""
+Tests for the Prometheus metrics
+"""
+import json
+import os
+import signal
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import metrics
+from user.authentication import token_cache
+
+METRICS_URL = reverse("prometheus-metrics")
+RECIPE_URL = reverse("recipe:recipe-list")
+TOKEN_URL = reverse("user:token")
+
+
+def get_samples(response):
+    """Return the value of each sample of a scrape, by name and labels"""
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+
+@override_settings(METRICS_TOKEN="secret")
+class PrometheusMetricsTests(TestCase):
+    """Test the metrics endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        metrics.registry.reset()
+        self.user = get_user_model().objects.create_user(
+            email="metrics@example.com", password="testpass123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def scrape(self):
+        # A client of its own, the API client's credentials would win.
+        res = Client().get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        return get_samples(res)
+
+    def test_requests_by_route(self):
+        """Test requests are counted and timed by route and status"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+
+        samples = self.scrape()
+
+        labels = 'method="GET",route="recipe:recipe-list"'
+        self.assertEqual(
+            samples[f'http_requests_total{{{labels},status="200"}}'], 2
+        )
+        self.assertEqual(
+            samples[f"http_request_duration_seconds_count{{{labels}}}"], 2
+        )
+        self.assertEqual(
+            samples[
+                f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+            ],
+            2,
+        )
+        self.assertGreater(samples['db_queries_total{database="default"}'], 0)
+
+    def test_cache_and_auth_metrics(self):
+        """Test cache lookups and authentication failures are counted"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+        self.client.get(RECIPE_URL)
+        self.client.credentials()
+        self.client.post(
+            TOKEN_URL, {"email": self.user.email, "password": "wrong"}
+        )
+
+        samples = self.scrape()
+
+        cache_requests = 'cache_requests_total{cache="%s",result="%s"}'
+        self.assertEqual(samples[cache_requests % ("recipe_list", "miss")], 1)
+        self.assertEqual(samples[cache_requests % ("recipe_list", "hit")], 1)
+        self.assertEqual(samples[cache_requests % ("token", "miss")], 2)
+        self.assertEqual(samples[cache_requests % ("token", "hit")], 1)
+        self.assertEqual(samples['auth_failures_total{reason="token"}'], 1)
+        self.assertEqual(samples['auth_failures_total{reason="login"}'], 1)
+
+    def test_metrics_token(self):
+        """Test scrapers must send METRICS_TOKEN"""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_disabled_without_token(self):
+        """Test the metrics are not served until a token is configured"""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_processes_add_up(self):
+        """Test a scrape adds the files flushed by the other processes"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        other = {
+            "counters": [
+                ["auth_failures_total", [["reason", "login"]], 3],
+            ],
+            "histograms": [],
+        }
+        path = os.path.join(directory.name, "metrics-1-other.json")
+        with open(path, "w") as output:
+            json.dump(other, output)
+
+        with override_settings(METRICS_DIR=directory.name):
+            metrics.inc("auth_failures_total", reason="login")
+            metrics.registry.flush()
+            samples = self.scrape()
+
+        self.assertEqual(len(os.listdir(directory.name)), 2)
+        self.assertEqual(samples['auth_failures_total{reason="login"}'], 4)
+
+    def test_fork_while_locked(self):
+        """Test a child forked while the lock is held can still count"""
+        with metrics.registry.lock:
+            pid = os.fork()
+            if pid == 0:
+                # Killed by the alarm if the child inherited the held lock.
+                signal.alarm(5)
+                metrics.inc("auth_failures_total", reason="login")
+                os._exit(0)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
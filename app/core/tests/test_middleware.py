@@ -0,0 +1,138 @@
+"""
+Tests for the performance middleware
+"""
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import middleware
+from core.models import Recipe
+
+RECIPE_URL = reverse("recipe:recipe-list")
+ME_URL = reverse("user:me")
+METRICS_URL = reverse("performance-metrics")
+
+
+def get_phases(response):
+    """Return the Server-Timing metric names and parameters"""
+    phases = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        phases[name] = dict(param.split("=", 1) for param in params)
+    return phases
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=1)
+class PerformanceMiddlewareTests(TestCase):
+    """Test the timings recorded for API requests"""
+
+    def setUp(self):
+        cache.clear()
+        middleware.histograms.clear()
+        self.user = get_user_model().objects.create_user(
+            email="perf@example.com", password="testpass123"
+        )
+        Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("1")
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_server_timing(self):
+        """Test the phases of a recipe list are reported"""
+        res = self.client.get(RECIPE_URL)
+
+        phases = get_phases(res)
+        self.assertEqual(
+            list(phases),
+            ["total", "view", "auth", "db", "serialize", "render"],
+        )
+        self.assertEqual(phases["db"]["desc"], '"3 queries"')
+        self.assertGreater(float(phases["total"]["dur"]), 0)
+
+    def test_log_line(self):
+        """Test a JSON line is logged for sampled requests"""
+        with self.assertLogs("core.performance", "INFO") as logs:
+            self.client.get(RECIPE_URL)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["route"], "GET recipe:recipe-list")
+        self.assertEqual(line["sql_count"], 3)
+
+    def test_route_histogram(self):
+        """Test requests are aggregated by route name"""
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+
+        stats = middleware.get_route_stats()["GET recipe:recipe-list"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(sum(stats["buckets"].values()), 2)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        """Test requests left out of the sample are not measured"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(middleware.get_route_stats(), {})
+
+    @override_settings(PERFORMANCE_SERVER_TIMING=False)
+    def test_header_disabled(self):
+        """Test the header can be turned off, keeping the histograms"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertIn("GET recipe:recipe-list", middleware.get_route_stats())
+
+    def test_metrics_admin_only(self):
+        """Test only admin users can read the histograms"""
+        self.client.get(ME_URL)
+
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        cache.clear()
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("GET user:me", res.data["routes"])
+
+    async def test_async_handler(self):
+        """Test the middleware also times requests under ASGI"""
+        headers = {"Authorization": f"Token {self.token.key}"}
+
+        res = await self.async_client.get(ME_URL, headers=headers)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("auth", get_phases(res))
+        self.assertIn("view", get_phases(res))
+
+
+class RouteHistogramTests(SimpleTestCase):
+    """Test the rolling histogram"""
+
+    @override_settings(PERFORMANCE_WINDOW_SECONDS=100)
+    def test_percentiles_and_window(self):
+        """Test percentiles come from the buckets of recent slots"""
+        histogram = middleware.RouteHistogram()
+        for duration in [3] * 90 + [40] * 9 + [700]:
+            histogram.record(1000, duration, 2)
+
+        stats = histogram.snapshot(1000)
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["p50_ms"], 5)
+        self.assertEqual(stats["p95_ms"], 50)
+        self.assertEqual(stats["p99_ms"], 50)
+        self.assertEqual(stats["max_ms"], 700)
+        self.assertEqual(stats["sql_per_request"], 2)
+
+        self.assertIsNone(histogram.snapshot(1100))
@@ -0,0 +1,82 @@
+"""
+Tests for the fast JSON renderer and parser
+"""
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+SAMPLE = {
+    "price": Decimal("4.64"),
+    "created": datetime.datetime(2024, 2, 19, 8, 48, tzinfo=timezone.utc),
+    "created_at_ms": datetime.datetime(2024, 2, 19, 8, 48, 0, 123456),
+    "day": datetime.date(2024, 2, 19),
+    "label": gettext_lazy("Recipes"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "text": "Café\u2028line\u2029",
+    "nested": [{"id": 1, "tags": ("a", "b")}],
+    "big": 2**70,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test FastJSONRenderer matches JSONRenderer"""
+
+    def test_render_matches_stdlib(self):
+        """Test output is byte-identical to DRF's renderer"""
+        expected = JSONRenderer().render(SAMPLE)
+
+        self.assertEqual(FastJSONRenderer().render(SAMPLE), expected)
+
+    def test_render_without_orjson(self):
+        """Test the renderer falls back when orjson is missing"""
+        with patch("core.renderers.orjson", None):
+            ret = FastJSONRenderer().render(SAMPLE)
+
+        self.assertEqual(ret, JSONRenderer().render(SAMPLE))
+
+    def test_render_indented(self):
+        """Test an indent in the media type is honoured"""
+        media_type = "application/json; indent=4"
+
+        ret = FastJSONRenderer().render({"a": 1}, media_type)
+
+        self.assertEqual(ret, b'{\n    "a": 1\n}')
+
+    def test_render_none(self):
+        """Test None renders an empty body"""
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test FastJSONParser"""
+
+    def test_parse(self):
+        """Test a JSON body is parsed"""
+        stream = BytesIO('{"title": "Café", "n": [1, 2.5]}'.encode())
+
+        data = FastJSONParser().parse(stream)
+
+        self.assertEqual(data, {"title": "Café", "n": [1, 2.5]})
+
+    def test_parse_error(self):
+        """Test malformed JSON raises a ParseError"""
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b"{invalid"))
+
+    def test_parse_without_orjson(self):
+        """Test the parser falls back when orjson is missing"""
+        with patch("core.parsers.orjson", None):
+            data = FastJSONParser().parse(BytesIO(b'{"a": 1}'))
+
+        self.assertEqual(data, {"a": 1})
@@ -0,0 +1,144 @@
+"""
+Tests for the read replica router
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from myproject.dbRouter import ReplicaRouter, check_pin_cache, use_replica
+
+RECIPE_URL = reverse("recipe:recipe-list")
+ME_URL = reverse("user:me")
+
+
+@override_settings(DB_REPLICAS=["replica1", "replica2"])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the routing decisions"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        token = use_replica.set(True)
+        self.addCleanup(use_replica.reset, token)
+
+    def test_reads_round_robin(self):
+        """Test reads alternate between the replicas"""
+        aliases = [self.router.db_for_read(Recipe) for _ in range(4)]
+
+        self.assertEqual(
+            aliases, ["replica1", "replica2", "replica1", "replica2"]
+        )
+
+    def test_primary_without_opt_in(self):
+        """Test reads stay on the primary unless the view opted in"""
+        use_replica.set(False)
+
+        self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_writes_and_migrations_on_primary(self):
+        """Test writes always use the primary, replicas are not migrated"""
+        self.assertEqual(self.router.db_for_write(Recipe), "default")
+        self.assertFalse(self.router.allow_migrate("replica1", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+    @override_settings(DB_REPLICA_STRATEGY="least_lag", DB_REPLICA_MAX_LAG=5)
+    def test_least_lag(self):
+        """Test the least lagging replica is used, if close enough"""
+        lags = {"replica1": 3.0, "replica2": 0.5}
+        with mock.patch("myproject.dbRouter.measure_lag", lags.get):
+            self.assertEqual(self.router.db_for_read(Recipe), "replica2")
+
+            self.router.lags.clear()
+            lags.update(replica1=6.0, replica2=float("inf"))
+            self.assertEqual(self.router.db_for_read(Recipe), "default")
+
+    @override_settings(DB_REPLICA_STRATEGY="least_lag")
+    def test_lag_measured_periodically(self):
+        """Test the lag is not measured on every read"""
+        with mock.patch(
+            "myproject.dbRouter.measure_lag", return_value=0.0
+        ) as lag:
+            self.router.db_for_read(Recipe)
+            self.router.db_for_read(Recipe)
+
+        # Once per replica, the second read reuses the measurements.
+        self.assertEqual(lag.call_count, 2)
+
+    @override_settings(DB_REPLICA_STRATEGY="least_lag")
+    async def test_lag_measured_out_of_loop(self):
+        """Test the lag is measured in a thread when routing in async code"""
+        with mock.patch(
+            "myproject.dbRouter.measure_lag", return_value=0.0
+        ) as lag:
+            # Not measured yet, the primary is used meanwhile.
+            self.assertEqual(self.router.db_for_read(Recipe), "default")
+            for thread in self.router.refreshing.values():
+                thread.join()
+
+            self.assertEqual(lag.call_count, 2)
+            self.assertEqual(self.router.db_for_read(Recipe), "replica1")
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        }
+    )
+    def test_pin_cache_must_be_shared(self):
+        """Test replicas are refused with a per-process pin cache"""
+        errors = check_pin_cache(None)
+        self.assertEqual([error.id for error in errors], ["myproject.E001"])
+
+        with override_settings(DB_REPLICAS=[]):
+            self.assertEqual(check_pin_cache(None), [])
+
+
+@override_settings(DB_REPLICAS=["default"])
+@mock.patch.object(ReplicaRouter, "choose_replica", return_value="default")
+class ReplicaReadsViewTests(TestCase):
+    """Test which API requests read from the replicas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="replica@example.com", password="testpass123"
+        )
+        Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("1")
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_safe_requests_use_replica(self, choose):
+        """Test recipe lists and the profile are read from a replica"""
+        self.client.get(RECIPE_URL)
+        self.client.get(ME_URL)
+
+        self.assertTrue(choose.called)
+
+    def test_user_pinned_after_write(self, choose):
+        """Test a user reads from the primary right after writing"""
+        payload = {"title": "New", "time_minutes": 5, "price": "1.00"}
+        self.client.post(RECIPE_URL, payload)
+        choose.reset_mock()
+
+        res = self.client.get(RECIPE_URL)
+
+        choose.assert_not_called()
+        self.assertEqual(len(res.data["results"]), 2)
+
+        cache.clear()
+        self.client.get(RECIPE_URL)
+        self.assertTrue(choose.called)
+
+    def test_routing_reset_after_request(self, choose):
+        """Test the routing does not leak past the request"""
+        self.client.get(RECIPE_URL)
+
+        self.assertFalse(use_replica.get())
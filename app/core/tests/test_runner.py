@@ -0,0 +1,65 @@
+"""
+Tests for the custom test runner output
+"""
+import io
+import unittest
+
+from django.test import SimpleTestCase
+
+from myproject.testRunner import ColoredTestResult
+
+
+def make_sample():
+    """Return a test case class, kept out of the discovered tests"""
+
+    class Sample(unittest.TestCase):
+        def test_fails(self):
+            self.assertEqual(1, 2)
+
+        def test_passes(self):
+            pass
+
+    return Sample
+
+
+class ColoredTestResultTests(SimpleTestCase):
+    """Test the per-test lines and timings"""
+
+    def run_sample(self):
+        stream = io.StringIO()
+        result = ColoredTestResult(
+            unittest.runner._WritelnDecorator(stream), True, 1
+        )
+        Sample = make_sample()
+        suite = unittest.TestSuite(
+            [Sample("test_fails"), Sample("test_passes")]
+        )
+        suite.run(result)
+        return result, stream.getvalue()
+
+    def test_outcome_per_test(self):
+        """Test a failure does not mark the tests after it as failed"""
+        result, output = self.run_sample()
+        lines = output.splitlines()
+
+        self.assertIn("test_fails", lines[0])
+        self.assertIn("Failed", lines[0])
+        self.assertIn("test_passes", lines[1])
+        self.assertIn("Passed", lines[1])
+        self.assertEqual(len(result.failures), 1)
+
+    def test_worker_timings_used(self):
+        """Test the durations sent by parallel workers are kept"""
+        test = make_sample()("test_passes")
+        stream = unittest.runner._WritelnDecorator(io.StringIO())
+        result = ColoredTestResult(stream, True, 1)
+
+        result.startTest(test)
+        result.addTiming(test, 2.5)
+        result.addSuccess(test)
+        result.stopTest(test)
+        result.print_slowest(5)
+
+        output = stream.getvalue()
+        self.assertIn("(2.500s)", output)
+        self.assertIn(f"2.500s  {test.id()}", output)
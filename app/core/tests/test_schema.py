@@ -0,0 +1,108 @@
+"""
+Tests for the cached OpenAPI schema
+"""
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.views import SpectacularAPIView
+
+from core import schema
+
+SCHEMA_URL = reverse("api-schema")
+
+
+def patch_generation():
+    """Count the schema generations, still running them"""
+    return mock.patch.object(
+        SpectacularAPIView,
+        "_get_schema_response",
+        autospec=True,
+        side_effect=SpectacularAPIView._get_schema_response,
+    )
+
+
+class CachedSchemaTests(SimpleTestCase):
+    """Test the schema is generated once per code version"""
+
+    def setUp(self):
+        cache.clear()
+        schema.schemas.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(
+            API_SCHEMA_DIR=directory.name, CODE_VERSION="v1"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_generated_once(self):
+        """Test the schema is rendered on the first request only"""
+        with patch_generation() as generate:
+            res1 = self.client.get(SCHEMA_URL)
+            schema.schemas.clear()
+            res2 = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(res1.status_code, 200)
+        self.assertEqual(res1.content, res2.content)
+        self.assertIn(b"/api/recipe/recipes/", res1.content)
+
+    def test_not_modified(self):
+        """Test a client with the current schema gets a 304"""
+        res1 = self.client.get(SCHEMA_URL)
+
+        res2 = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res1["ETag"])
+
+        self.assertEqual(res2.status_code, 304)
+        self.assertEqual(res2.content, b"")
+        self.assertEqual(res1["ETag"], schema.make_etag(res1.content))
+
+    def test_formats_cached_apart(self):
+        """Test the YAML and JSON schemas do not mix"""
+        yaml = self.client.get(SCHEMA_URL)
+        json = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertTrue(json.content.startswith(b"{"))
+        self.assertNotEqual(yaml["ETag"], json["ETag"])
+        self.assertIn("json", json["Content-Type"])
+
+    def test_new_code_version(self):
+        """Test a new code version generates the schema again"""
+        with patch_generation() as generate:
+            self.client.get(SCHEMA_URL)
+            with override_settings(CODE_VERSION="v2"):
+                self.client.get(SCHEMA_URL)
+
+        self.assertEqual(generate.call_count, 2)
+
+    def test_generate_command(self):
+        """Test the command renders the schema for the view to serve"""
+        stale = self.directory / "v0-default-en-us.json"
+        stale.write_text("{}")
+
+        call_command("generateSchema", stdout=mock.Mock())
+        cache.clear()
+        schema.schemas.clear()
+        with patch_generation() as generate:
+            res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        generate.assert_not_called()
+        path = self.directory / "v1-default-en-us.json"
+        self.assertEqual(res.content, path.read_bytes())
+        self.assertTrue((self.directory / "v1-default-en-us.yaml").exists())
+        self.assertFalse(stale.exists())
+
+    def test_no_warnings(self):
+        """Test every endpoint is described or explicitly left out"""
+        call_command(
+            "spectacular",
+            "--fail-on-warn",
+            "--file",
+            str(self.directory / "schema.yaml"),
+        )
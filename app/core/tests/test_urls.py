@@ -0,0 +1,42 @@
+"""
+Tests for the optional URL configuration
+"""
+import importlib
+
+from django.test import SimpleTestCase, override_settings
+
+from myproject import urls
+
+
+class OptionalUrlsTests(SimpleTestCase):
+    """Test the docs and admin can be left out"""
+
+    def tearDown(self):
+        importlib.reload(urls)
+
+    def get_routes(self):
+        importlib.reload(urls)
+        return {str(pattern.pattern) for pattern in urls.urlpatterns}
+
+    def test_docs_and_admin_enabled(self):
+        """Test the docs and admin are routed by default"""
+        routes = self.get_routes()
+
+        self.assertTrue(
+            {"admin/", "api/schema/", "api/docs/"}.issubset(routes)
+        )
+
+    @override_settings(ENABLE_API_DOCS=False, ENABLE_ADMIN=False)
+    def test_docs_and_admin_disabled(self):
+        """Test the production profile only routes the API"""
+        routes = self.get_routes()
+
+        self.assertEqual(
+            routes,
+            {
+                "api/user/",
+                "api/recipe/",
+                "api/metrics/performance/",
+                "metrics/",
+            },
+        )
@@ -0,0 +1,83 @@
+"""
+Timings of the phases of the request being handled
+
+PerformanceMiddleware sets `current` for the sampled requests; elsewhere
+measure() and the SQL timer cost one context variable lookup.
+"""
+import contextlib
+import contextvars
+import time
+
+current = contextvars.ContextVar("request_timings", default=None)
+
+NOT_MEASURED = contextlib.nullcontext()
+
+
+class RequestTimings:
+    """Seconds spent in each phase of one request, and its SQL queries"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.phases = {}
+        self.active = set()
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # A phase nested in itself, like a serializer inside another, is
+        # counted once by the outer one.
+        if name in self.active:
+            yield
+            return
+
+        self.active.add(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active.discard(name)
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+
+def measure(name):
+    """Add the time spent in the block to a phase of the current request"""
+    timings = current.get()
+    if timings is None:
+        return NOT_MEASURED
+    return timings.phase(name)
+
+
+def time_sql(execute, sql, params, many, context):
+    """Execute wrapper counting the queries of the current request"""
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql_count += 1
+        timings.sql_time += time.perf_counter() - start
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    """
+    Add time_sql to every database connection, on connection_created.
+
+    A permanent wrapper also sees the queries the async views run in
+    sync_to_async threads, which a wrapper set up per request would miss.
+    """
+    if time_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_sql)
+
+
+class TimedSerializerMixin:
+    """Count to_representation as the serialize phase"""
+
+    def to_representation(self, instance):
+        with measure("serialize"):
+            return super().to_representation(instance)
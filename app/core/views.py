@@ -1,3 +1,58 @@
-from django.shortcuts import render  # noqa
+"""
+Views for the operational endpoints
+"""
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import metrics
+from core.middleware import get_route_stats
+from user.authentication import CachedTokenAuthentication
+
+
+class PerformanceMetricsView(APIView):
+    """Rolling latency histograms per route, of this process"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+    # An operator endpoint, left out of the API schema.
+    schema = None
+
+    def get(self, request):
+        return Response(
+            {
+                "window_seconds": settings.PERFORMANCE_WINDOW_SECONDS,
+                "sample_rate": settings.PERFORMANCE_SAMPLE_RATE,
+                "routes": get_route_stats(),
+            }
+        )
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    Metrics of every worker process, for Prometheus to scrape.
+
+    A plain Django view, so scrapes skip DRF's authentication and content
+    negotiation. Scrapers send METRICS_TOKEN as a bearer token; without
+    one configured the endpoint does not exist.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        raise Http404
+
+    expected = f"Bearer {token}".encode()
+    given = request.headers.get("Authorization", "").encode()
+    if not hmac.compare_digest(given, expected):
+        response = HttpResponse(status=401)
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4"
+    )
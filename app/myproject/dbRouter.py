@@ -0,0 +1,178 @@
+"""
+Database router sending the reads of safe API requests to replicas
+
+Views opt in with core.replicas.ReplicaReadsMixin, which sets use_replica
+for the request. Everything else, and every write, uses the primary.
+"""
+import asyncio
+import contextvars
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+use_replica = contextvars.ContextVar("use_replica", default=False)
+
+LAG_SQL = (
+    "SELECT COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+
+def get_replicas():
+    """Return the aliases of the configured replicas"""
+    return list(getattr(settings, "DB_REPLICAS", []))
+
+
+# Caches only the process that set a pin can read.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get_pin_cache():
+    """Return the cache holding the pins, shared by every worker"""
+    return caches[getattr(settings, "DB_REPLICA_PIN_CACHE_ALIAS", "default")]
+
+
+def pin_key(user_id):
+    return f"db:pinned:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Read the user's data from the primary for a while after a write"""
+    timeout = getattr(settings, "DB_REPLICA_PIN_SECONDS", 10)
+    get_pin_cache().set(pin_key(user_id), True, timeout=timeout)
+
+
+def is_pinned(user_id):
+    return get_pin_cache().get(pin_key(user_id)) is not None
+
+
+def check_pin_cache(app_configs, **kwargs):
+    """Refuse replicas without a cache the workers share for the pins"""
+    if not get_replicas():
+        return []
+
+    alias = getattr(settings, "DB_REPLICA_PIN_CACHE_ALIAS", "default")
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend in PROCESS_LOCAL_CACHES:
+        return [
+            checks.Error(
+                f"The {alias!r} cache is local to each process, so a user "
+                "pinned to the primary after a write is not pinned on the "
+                "other workers.",
+                hint="Point DB_REPLICA_PIN_CACHE_ALIAS at a shared cache, "
+                "such as Redis or Memcached.",
+                id="myproject.E001",
+            )
+        ]
+    return []
+
+
+def measure_lag(alias):
+    """Return how many seconds a replica is behind, inf if unreachable"""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        return float("inf")
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class ReplicaRouter:
+    """
+    Route reads to a replica when use_replica is set, writes to primary.
+
+    DB_REPLICA_STRATEGY picks the replica: round_robin, or least_lag which
+    measures each replica's lag every DB_REPLICA_LAG_CHECK_INTERVAL
+    seconds and falls back to the primary when all are further behind
+    than DB_REPLICA_MAX_LAG. The lag is measured from the last replayed
+    transaction, so an idle primary also shows up as lag.
+    """
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.lags = {}
+        self.refreshing = {}
+
+    def db_for_read(self, model, **hints):
+        if not use_replica.get():
+            return None
+
+        replicas = get_replicas()
+        if not replicas:
+            return None
+        return self.choose_replica(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+    def choose_replica(self, replicas):
+        strategy = getattr(settings, "DB_REPLICA_STRATEGY", "round_robin")
+        if strategy == "least_lag":
+            return self.least_lagged(replicas)
+        return replicas[next(self.counter) % len(replicas)]
+
+    def least_lagged(self, replicas):
+        max_lag = getattr(settings, "DB_REPLICA_MAX_LAG", 5)
+        lags = {alias: self.get_lag(alias) for alias in replicas}
+        alias = min(lags, key=lags.get)
+        return alias if lags[alias] <= max_lag else DEFAULT_DB_ALIAS
+
+    def get_lag(self, alias):
+        """Return the last measured lag, measuring again if it is old"""
+        interval = getattr(settings, "DB_REPLICA_LAG_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        checked, lag = self.lags.get(alias, (None, float("inf")))
+        if checked is not None and now - checked <= interval:
+            return lag
+
+        if not in_event_loop():
+            lag = measure_lag(alias)
+            self.lags[alias] = (now, lag)
+            return lag
+
+        # Queries cannot run in the event loop, measure in a thread and use
+        # the last measurement meanwhile; unmeasured replicas are not used.
+        thread = self.refreshing.get(alias)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(
+                target=self.refresh_lag, args=(alias,), daemon=True
+            )
+            self.refreshing[alias] = thread
+            thread.start()
+        return lag
+
+    def refresh_lag(self, alias):
+        try:
+            self.lags[alias] = (time.monotonic(), measure_lag(alias))
+        finally:
+            # The thread is done with its connections.
+            connections.close_all()
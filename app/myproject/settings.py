@@ -30,11 +30,24 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# The schema/docs stack and the admin are slow to import and unused by the
+# API clients. Production images set both to 0 for a faster cold start,
+# see `python manage.py profileStartup`.
+ENABLE_API_DOCS = os.environ.get("ENABLE_API_DOCS", "1") == "1"
+ENABLE_ADMIN = os.environ.get("ENABLE_ADMIN", "1") == "1"
+
+# The OpenAPI schema is rendered once per code version. CODE_VERSION is set
+# by the build, e.g. to the git commit, and defaults to a hash of the code.
+# `python manage.py generateSchema` renders it ahead of time to
+# API_SCHEMA_DIR, otherwise the first request renders it into the cache.
+CODE_VERSION = os.environ.get("CODE_VERSION", "")
+API_SCHEMA_DIR = os.environ.get("API_SCHEMA_DIR", str(BASE_DIR / "openapi"))
+API_SCHEMA_CACHE_ALIAS = "default"
+
 
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -43,12 +56,16 @@ INSTALLED_APPS = [
     "core.apps.CoreConfig",
     "rest_framework",
     "rest_framework.authtoken",
-    "drf_spectacular",
     "user.apps.UserConfig",
     "recipe.apps.RecipeConfig",
 ]
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, "django.contrib.admin")
+if ENABLE_API_DOCS:
+    INSTALLED_APPS.append("drf_spectacular")
 
 MIDDLEWARE = [
+    "core.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -58,6 +75,47 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Share of the requests PerformanceMiddleware times; each gets a
+# Server-Timing header, a core.performance log line and goes into the
+# per-route histograms of /api/metrics/performance/ (admin users only).
+PERFORMANCE_SAMPLE_RATE = float(
+    os.environ.get("PERFORMANCE_SAMPLE_RATE", 0.1)
+)
+PERFORMANCE_SERVER_TIMING = (
+    os.environ.get("PERFORMANCE_SERVER_TIMING", "1") == "1"
+)
+PERFORMANCE_WINDOW_SECONDS = int(
+    os.environ.get("PERFORMANCE_WINDOW_SECONDS", 300)
+)
+
+# The JSON lines of core.performance, one per sampled request, go to stderr.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"message": {"format": "%(message)s"}},
+    "handlers": {
+        "performance": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "core.performance": {
+            "handlers": ["performance"],
+            "level": os.environ.get("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# Prometheus metrics at /metrics/. Processes flush their counts to files in
+# METRICS_DIR so that a scrape covers every worker; empty it when the service
+# starts. Without it a scrape only sees the process serving it. Scrapers send
+# METRICS_TOKEN as a bearer token, /metrics/ answers 404 while it is unset.
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 ROOT_URLCONF = "myproject.urls"
 
 TEMPLATES = [
@@ -78,6 +136,18 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "myproject.wsgi.application"
 
+# Colored per-test output with durations and the slowest tests, e.g.
+#   python manage.py test --parallel auto --slowest 20
+TEST_RUNNER = "myproject.testRunner.CustomTestRunner"
+# Scales the latency budgets of core.testing.QueryBudgetMixin, 0 skips them.
+QUERY_BUDGET_TIME_FACTOR = float(os.environ.get("QUERY_BUDGET_TIME_FACTOR", 1))
+
+# Serve the recipe, tag and profile reads with the async views in
+# core.asyncViews. Only worth it under an ASGI server, e.g.
+#   uvicorn myproject.asgi:application --workers 4
+# Persistent connections are turned off then, see DATABASES.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "0") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -90,9 +160,91 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASS"),
         "HOST": os.environ.get("DB_HOST"),
         "PORT": os.environ.get("DB_PORT"),
+        # Keep connections open between requests, checking them first so
+        # a connection the server dropped is replaced, not handed out.
+        # Not under ASGI, where Django does not reuse them reliably and
+        # recommends a pooler instead.
+        "CONN_MAX_AGE": (
+            0 if ASYNC_VIEWS else int(os.environ.get("DB_CONN_MAX_AGE", 60))
+        ),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1"
+        ),
+        # Set to 1 behind PgBouncer in transaction pooling mode: the named
+        # cursors QuerySet.iterator() uses cannot outlive a transaction
+        # there. With a pooler DB_CONN_MAX_AGE=0 is usually enough, the
+        # pooler keeps the server connections warm.
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS", "0") == "1"
+        ),
+    }
+}
+
+# Read replicas as comma separated host[:port], same credentials as the
+# primary. Safe requests of views using core.replicas.ReplicaReadsMixin
+# read from them, see myproject.dbRouter.
+DB_REPLICAS = []
+for index, address in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DB_REPLICAS.append(f"replica{index}")
+
+DATABASE_ROUTERS = ["myproject.dbRouter.ReplicaRouter"]
+DB_REPLICA_STRATEGY = os.environ.get("DB_REPLICA_STRATEGY", "round_robin")
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(
+    os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 5)
+)
+# How long a user reads from the primary after writing. The pins live in
+# this cache, which every worker must share (checked at startup).
+DB_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 10))
+DB_REPLICA_PIN_CACHE_ALIAS = os.environ.get(
+    "DB_REPLICA_PIN_CACHE_ALIAS", "default"
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHE_BACKEND = os.environ.get(
+    "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
+# Redis and memcached evict on their own (maxmemory-policy / -m), only the
+# Django-managed backends take an entry limit.
+if CACHE_BACKEND.rsplit(".", 1)[-1] in ("LocMemCache", "FileBasedCache"):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 10000)),
+    }
+
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 300))
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_BYTES", 512 * 1024)
+)
+
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 30))
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get("TOKEN_CACHE_MAX_SIZE", 10000))
+TOKEN_CACHE_ALIAS = os.environ.get("TOKEN_CACHE_ALIAS") or None
+
+# Login and signup rate limit counters, shared by every process when the
+# default cache is Redis or memcached.
+THROTTLE_CACHE_ALIAS = os.environ.get("THROTTLE_CACHE_ALIAS", "default")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -113,6 +265,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+PASSWORD_HASHERS = [
+    "user.hashing.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# Hashing cost; existing hashes are upgraded on the next login.
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 600000)
+)
+
+# Signup and token login hash on this many threads, with at most
+# PASSWORD_HASH_QUEUE_SIZE more waiting before answering 503.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 32))
+PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -136,4 +308,27 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
-REST_FRAMEWORK = {"DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"}
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.environ.get("THROTTLE_LOGIN_IP", "30/min"),
+        "login_email": os.environ.get("THROTTLE_LOGIN_EMAIL", "10/min"),
+        "signup_ip": os.environ.get("THROTTLE_SIGNUP_IP", "20/hour"),
+        "signup_email": os.environ.get("THROTTLE_SIGNUP_EMAIL", "5/hour"),
+    },
+    # Proxies in front of the app; 0 keys throttles on REMOTE_ADDR and
+    # ignores a client supplied X-Forwarded-For.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+}
+if ENABLE_API_DOCS:
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = (
+        "drf_spectacular.openapi.AutoSchema"
+    )
@@ -1,31 +1,153 @@
-from django.test.runner import DiscoverRunner
+import logging
+import time
+import unittest
+
+from django.test.runner import (
+    DiscoverRunner,
+    ParallelTestSuite,
+    RemoteTestResult,
+    RemoteTestRunner,
+)
 from termcolor import colored
-from unittest import TestResult
+
+OUTCOMES = {
+    "success": ("Passed", "green"),
+    "failure": ("Failed", "red"),
+    "error": ("Error", "red"),
+    "skip": ("Skipped", "yellow"),
+    "expected_failure": ("Expected failure", "green"),
+    "unexpected_success": ("Unexpected success", "red"),
+}
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    """Send the duration of each test from the worker to the parent"""
+
+    def startTest(self, test):
+        super().startTest(test)
+        self.started = time.perf_counter()
+
+    def stopTest(self, test):
+        duration = time.perf_counter() - self.started
+        self.events.append(("addTiming", self.test_index, duration))
+        super().stopTest(test)
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class ColoredTestResult(unittest.TextTestResult):
+    """
+    Print one colored line with the outcome and duration of each test.
+
+    With --parallel the events of the workers are replayed here, the
+    durations are the ones measured in the workers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The lines below replace unittest's own progress output.
+        self.showAll = False
+        self.dots = False
+        self.timings = {}
+
+    def startTest(self, test):
+        super().startTest(test)
+        self.started = time.perf_counter()
+        self.outcome = "success"
+
+    def addTiming(self, test, duration):
+        self.timings[test.id()] = duration
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.outcome = "failure"
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.outcome = "error"
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            failed = issubclass(err[0], test.failureException)
+            self.outcome = "failure" if failed else "error"
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.outcome = "skip"
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self.outcome = "expected_failure"
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.outcome = "unexpected_success"
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        duration = self.timings.setdefault(
+            test.id(), time.perf_counter() - self.started
+        )
+        label, color = OUTCOMES[self.outcome]
+        name = getattr(test, "_testMethodName", str(test))
+        self.stream.writeln(
+            f"Test {self.testsRun}: {name}: {colored(label, color)} "
+            f"({duration:.3f}s)"
+        )
+        self.stream.flush()
+
+    def print_slowest(self, count):
+        """Print the tests that took the longest"""
+        slowest = sorted(self.timings.items(), key=lambda item: -item[1])
+        if not count or not slowest:
+            return
+
+        self.stream.writeln(colored(f"Slowest {count} tests", "cyan"))
+        for test_id, duration in slowest[:count]:
+            self.stream.writeln(f"{duration:8.3f}s  {test_id}")
 
 
 class CustomTestRunner(DiscoverRunner):
-    def run_suite(self, suite, **kwargs):
-        # Get the number of tests in the suite
-        num_tests = suite.countTestCases()
+    parallel_test_suite = TimedParallelTestSuite
 
-        result = TestResult()
+    def __init__(self, slowest=10, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = slowest
 
-        # Print a header
-        print(colored(f"Running {num_tests} Tests", "cyan"))
-        print("=" * 30)
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--slowest",
+            type=int,
+            default=10,
+            help="Number of slowest tests to list, 0 to disable.",
+        )
 
-        # Iterate through each test and run them
-        for index, test in enumerate(suite):
-            # Print the title of the test
-            print(f"Test {index + 1}: {test._testMethodName}", end=": ")
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # One line per sampled request would drown the per-test output.
+        if self.verbosity < 3:
+            logging.getLogger("core.performance").setLevel(logging.WARNING)
 
-            # Run the test
-            test(result)
+    def get_resultclass(self):
+        # Keep Django's results for --debug-sql and --pdb.
+        return super().get_resultclass() or ColoredTestResult
+
+    def run_suite(self, suite, **kwargs):
+        # Print a header
+        print(colored(f"Running {suite.countTestCases()} Tests", "cyan"))
+        print("=" * 30)
 
-            # Print the result
-            if not result.errors and not result.failures:
-                print(colored("Passed", "green"))
-            else:
-                print(colored("Failed", "red"))
+        result = super().run_suite(suite, **kwargs)
+        if isinstance(result, ColoredTestResult):
+            result.print_slowest(self.slowest)
 
         return result
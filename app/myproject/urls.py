@@ -14,18 +14,38 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path
 
+from core.views import PerformanceMetricsView, prometheus_metrics
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
-        name="api-docs",
-    ),
     path("api/user/", include("user.urls")),
     path("api/recipe/", include("recipe.urls")),
+    path(
+        "api/metrics/performance/",
+        PerformanceMetricsView.as_view(),
+        name="performance-metrics",
+    ),
+    path("metrics/", prometheus_metrics, name="prometheus-metrics"),
 ]
+
+# Imported only when enabled, both stacks add to the cold start.
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
+
+if settings.ENABLE_API_DOCS:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    from core.schema import CachedSchemaView
+
+    urlpatterns += [
+        path("api/schema/", CachedSchemaView.as_view(), name="api-schema"),
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="api-schema"),
+            name="api-docs",
+        ),
+    ]
@@ -0,0 +1,70 @@
+"""
+Batched writes for the bulk recipe endpoint
+"""
+from django.db import transaction
+
+from core.models import Recipe
+from recipe.cache import bump_version
+from recipe.tagging import BATCH_SIZE, link_tags, resolve_tags
+
+
+def collect_tag_names(items):
+    """Return every tag name used by the validated items"""
+    return [name for item in items for name in item.get("tags", [])]
+
+
+def create_recipes(user, items):
+    """Create recipes and their tag links in one transaction"""
+    with transaction.atomic():
+        tags = resolve_tags(user, collect_tag_names(items))
+        recipes = [
+            Recipe(user=user, **{k: v for k, v in item.items() if k != "tags"})
+            for item in items
+        ]
+        Recipe.objects.bulk_create(recipes, batch_size=BATCH_SIZE)
+        link_tags(
+            {
+                recipe: [tags[name] for name in item.get("tags", [])]
+                for recipe, item in zip(recipes, items)
+            }
+        )
+
+    # bulk_create sends no signals, invalidate the list cache ourselves.
+    bump_version(user.pk)
+    return recipes
+
+
+def update_recipes(user, recipes, items):
+    """Apply partial updates to recipes in one transaction"""
+    fields = set()
+    recipe_tags = {}
+    for recipe, item in zip(recipes, items):
+        for field, value in item.items():
+            if field != "tags":
+                setattr(recipe, field, value)
+                fields.add(field)
+
+    with transaction.atomic():
+        if fields:
+            Recipe.objects.bulk_update(
+                recipes, sorted(fields), batch_size=BATCH_SIZE
+            )
+
+        tags = resolve_tags(user, collect_tag_names(items))
+        for recipe, item in zip(recipes, items):
+            if "tags" in item:
+                recipe_tags[recipe] = [tags[name] for name in item["tags"]]
+        if recipe_tags:
+            link_tags(recipe_tags, replace=True)
+
+    bump_version(user.pk)
+    return recipes
+
+
+def delete_recipes(queryset, ids):
+    """Delete the recipes with the given ids, return the deleted ids"""
+    with transaction.atomic():
+        found = set(queryset.filter(id__in=ids).values_list("id", flat=True))
+        queryset.filter(id__in=found).delete()
+
+    return found
@@ -0,0 +1,164 @@
+"""
+Per-user versioned cache for recipe API list responses
+"""
+import hashlib
+import pickle
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import metrics
+
+
+def get_cache():
+    """Return the cache backend used for list responses"""
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def version_key(user_id):
+    return f"recipe:version:{user_id}"
+
+
+def new_version():
+    """Return a version that was never handed out before"""
+    # Seeding from the clock means a counter lost to eviction restarts
+    # above every value it had reached, so stale entries are never served.
+    return time.time_ns() // 1000
+
+
+def get_version(user_id):
+    """Return the current list cache version for a user"""
+    cache = get_cache()
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+
+    return version
+
+
+async def aget_version(user_id):
+    """Async counterpart of get_version"""
+    cache = get_cache()
+    key = version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = new_version()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate every cached list response of a user"""
+    cache = get_cache()
+    key = version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), timeout=None)
+
+
+def bump_version_on_commit(user_id):
+    """
+    Bump the user's version once the current transaction commits.
+
+    A list read between an earlier bump and the commit would still see the
+    old rows and cache them under the new version.
+    """
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+def record_lookup(result):
+    metrics.inc("cache_requests_total", cache="recipe_list", result=result)
+
+
+class CachedListMixin:
+    """
+    Serve list responses from a cache keyed by user and version.
+
+    Any write to the user's recipes or tags bumps the version (see
+    recipe.signals), so cached pages never need to be deleted one by one.
+    """
+
+    def list(self, request, *args, **kwargs):
+        version = get_version(request.user.pk)
+        tag, key = self.get_list_cache_keys(request, version)
+        if self.is_not_modified(request, tag):
+            record_lookup("not_modified")
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            return self.finalize_list_response(response, tag)
+
+        cache = get_cache()
+        data = cache.get(key)
+        record_lookup("miss" if data is None else "hit")
+        if data is not None:
+            return self.finalize_list_response(Response(data), tag)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if self.is_cacheable(response.data):
+                cache.set(key, response.data, timeout=self.get_timeout())
+
+        return self.finalize_list_response(response, tag)
+
+    async def alist(self, request, *args, **kwargs):
+        """Async counterpart of list, for core.asyncViews"""
+        version = await aget_version(request.user.pk)
+        tag, key = self.get_list_cache_keys(request, version)
+        if self.is_not_modified(request, tag):
+            record_lookup("not_modified")
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            return self.finalize_list_response(response, tag)
+
+        cache = get_cache()
+        data = await cache.aget(key)
+        record_lookup("miss" if data is None else "hit")
+        if data is not None:
+            return self.finalize_list_response(Response(data), tag)
+
+        response = await super().alist(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if self.is_cacheable(response.data):
+                await cache.aset(
+                    key, response.data, timeout=self.get_timeout()
+                )
+
+        return self.finalize_list_response(response, tag)
+
+    def get_list_cache_keys(self, request, version):
+        """Return the ETag value and cache key of the requested list"""
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        tag = f'"{self.basename}-{request.user.pk}-{version}-{path}"'
+        key = f"recipe:list:{self.basename}:{request.user.pk}:{version}:{path}"
+        return tag, key
+
+    def is_not_modified(self, request, tag):
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        return tag in [etag.removeprefix("W/") for etag in etags]
+
+    def is_cacheable(self, data):
+        """Return whether the list data is under the size limit"""
+        max_bytes = getattr(settings, "RESPONSE_CACHE_MAX_BYTES", None)
+        if max_bytes is None:
+            return True
+        return len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)) <= max_bytes
+
+    def get_timeout(self):
+        return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+
+    def finalize_list_response(self, response, tag):
+        """Add the validator and make sure only the user may reuse it"""
+        response["ETag"] = f"W/{tag}"
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
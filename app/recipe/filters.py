@@ -0,0 +1,64 @@
+"""
+Query parameter filters for the recipe list endpoint
+"""
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
+
+from core.models import Recipe
+
+
+class TagIdsField(serializers.CharField):
+    """Comma separated list of tag ids"""
+
+    default_error_messages = {
+        "invalid": "Expected a comma separated list of tag ids.",
+    }
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            return [int(item) for item in value.split(",") if item.strip()]
+        except ValueError:
+            self.fail("invalid")
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Validate recipe list filters from the query string"""
+
+    tags = TagIdsField(required=False)
+    price_min = serializers.DecimalField(
+        max_digits=7, decimal_places=2, required=False
+    )
+    price_max = serializers.DecimalField(
+        max_digits=7, decimal_places=2, required=False
+    )
+    time_min = serializers.IntegerField(min_value=0, required=False)
+    time_max = serializers.IntegerField(min_value=0, required=False)
+
+
+def filter_recipes(queryset, query_params):
+    """
+    Apply ?tags=1,5&price_max=20&time_max=30 style filters.
+
+    Tags match recipes having any of the given tags through an EXISTS
+    semi-join on the through table, so a recipe is never duplicated.
+    """
+    serializer = RecipeFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    filters = serializer.validated_data
+
+    if filters.get("tags"):
+        links = Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef("pk"), tags_id__in=filters["tags"]
+        )
+        queryset = queryset.filter(Exists(links))
+    if "price_min" in filters:
+        queryset = queryset.filter(price__gte=filters["price_min"])
+    if "price_max" in filters:
+        queryset = queryset.filter(price__lte=filters["price_max"])
+    if "time_min" in filters:
+        queryset = queryset.filter(time_minutes__gte=filters["time_min"])
+    if "time_max" in filters:
+        queryset = queryset.filter(time_minutes__lte=filters["time_max"])
+
+    return queryset
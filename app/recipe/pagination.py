@@ -0,0 +1,218 @@
+"""
+Keyset (seek) pagination for recipe API list endpoints
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate by seeking past the last row of the previous page.
+
+    The cursor is an opaque token holding the ordering values of the last
+    row returned, so every page is a single indexed range scan no matter
+    how deep the client has paged.
+    """
+
+    ordering = ("-id",)
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results from the queryset"""
+        self.setup(request, view)
+        rows = list(self.get_page_queryset(queryset))
+        return self.get_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of paginate_queryset"""
+        self.setup(request, view)
+        rows = [row async for row in self.get_page_queryset(queryset)]
+        return self.get_page(rows)
+
+    def setup(self, request, view):
+        """Read the page size and ordering for the request"""
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+
+    def get_page_queryset(self, queryset):
+        """Return the queryset for the requested page, unevaluated"""
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(self.request)
+        if position is not None:
+            position = self.clean_position(queryset, position)
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        # Fetch one extra row to learn whether there is a next page.
+        return queryset[: self.page_size_value + 1]
+
+    def get_page(self, rows):
+        """Trim the extra row fetched by get_page_queryset"""
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[: self.page_size_value]
+        self.next_position = (
+            self.get_position(rows[-1]) if self.has_next else None
+        )
+        return rows
+
+    def get_ordering(self, view):
+        """Return the ordering, letting the view override it"""
+        ordering = None
+        if hasattr(view, "get_pagination_ordering"):
+            ordering = view.get_pagination_ordering()
+        return tuple(ordering or self.ordering)
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, if valid"""
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+
+        try:
+            size = int(value)
+        except ValueError:
+            return self.page_size
+
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_seek_filter(self, position):
+        """Build the filter selecting rows after the given position"""
+        seek = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            seek |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        return seek
+
+    def get_position(self, row):
+        """Return the ordering values of a row"""
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, position):
+        """Encode a position into an opaque cursor string"""
+        data = json.dumps(position, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """Decode the cursor from the request, if one was provided"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            data = base64.urlsafe_b64decode(encoded + padding)
+            position = json.loads(data)
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def clean_position(self, queryset, position):
+        """Convert the cursor values to the types of the ordering fields"""
+        values = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            if name in queryset.query.annotations:
+                model_field = queryset.query.annotations[name].output_field
+            else:
+                model_field = queryset.model._meta.get_field(name)
+
+            try:
+                value = model_field.to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+
+        return values
+
+    def get_next_link(self):
+        """Return the URL of the next page, if there is one"""
+        if self.next_position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.next_position)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class RecipePagination(KeysetPagination):
+    """Newest recipes first, seeking on id"""
+
+    ordering = ("-id",)
+
+
+class TagsPagination(KeysetPagination):
+    """Tags in reverse name order, seeking on (name, id)"""
+
+    ordering = ("-name", "-id")
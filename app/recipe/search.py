@@ -0,0 +1,48 @@
+"""
+Full-text search over recipe titles and descriptions
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+TERM_RE = re.compile(r"\w+")
+MAX_TERMS = 10
+
+
+def parse_terms(text):
+    """Split search text into plain word terms"""
+    return TERM_RE.findall(text)[:MAX_TERMS]
+
+
+def search_recipes(queryset, text):
+    """
+    Filter recipes matching every term as a prefix.
+
+    Return the queryset and the ordering to paginate it by. PostgreSQL uses
+    the trigger-maintained search_vector and its GIN index and ranks the
+    results; other databases fall back to unranked substring matching.
+    """
+    terms = parse_terms(text)
+    if not terms:
+        return queryset.none(), None
+
+    if connections[queryset.db].vendor == "postgresql":
+        query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            config="english",
+            search_type="raw",
+        )
+        # Cast ts_rank's real to a double so it survives the cursor exactly.
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=rank
+        )
+        return queryset, ("-search_rank", "-id")
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition), None
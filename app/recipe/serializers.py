@@ -1,17 +1,80 @@
 """Serializer for Recipe API"""
 
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import serializers
 from core.models import Recipe, Tags
+from core.timing import TimedSerializerMixin
+from recipe.tagging import link_tags, resolve_tags
+
+
+class TagNamesField(serializers.ListField):
+    """Recipe tags written and read as a list of tag names"""
+
+    child = serializers.CharField(max_length=100)
+
+    def to_representation(self, value):
+        # Reads the prefetched tags, so no query per recipe in lists.
+        return sorted(tag.name for tag in value.all())
+
+    def bulk_representation(self, pks):
+        """Return {recipe id: tag names} for many recipes in one query"""
+        return self.group_names(pks, self.get_links(pks))
+
+    async def abulk_representation(self, pks):
+        """Async counterpart of bulk_representation"""
+        links = [link async for link in self.get_links(pks)]
+        return self.group_names(pks, links)
+
+    def get_links(self, pks):
+        links = Recipe.tags.through.objects.filter(recipe_id__in=pks)
+        return links.values_list("recipe_id", "tags__name")
+
+    def group_names(self, pks, links):
+        names = defaultdict(list)
+        for recipe_id, name in links:
+            names[recipe_id].append(name)
 
+        return {pk: sorted(names[pk]) for pk in pks}
 
-class RecipeSerializer(serializers.ModelSerializer):
+
+class RecipeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Recipe"""
 
+    tags = TagNamesField(required=False)
+
     class Meta:
         model = Recipe
-        fields = ["id", "title", "time_minutes", "price"]
+        fields = ["id", "title", "time_minutes", "price", "tags"]
         read_only_fields = ["id"]
 
+    def create(self, validated_data):
+        """Create a recipe and link its tags by name"""
+        names = validated_data.pop("tags", [])
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            self.set_tags(recipe, names, replace=False)
+
+        return recipe
+
+    def update(self, instance, validated_data):
+        """Update a recipe, replacing its tags when they are given"""
+        names = validated_data.pop("tags", None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if names is not None:
+                self.set_tags(instance, names, replace=True)
+
+        return instance
+
+    def set_tags(self, recipe, names, replace):
+        if not names and not replace:
+            return
+
+        tags = resolve_tags(recipe.user, names)
+        link_tags({recipe: [tags[name] for name in names]}, replace=replace)
+
 
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for Recipe detail view"""
@@ -20,7 +83,7 @@ class RecipeDetailSerializer(RecipeSerializer):
         fields = RecipeSerializer.Meta.fields + ["description"]
 
 
-class TagsSerializer(serializers.ModelSerializer):
+class TagsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for tags"""
 
     class Meta:
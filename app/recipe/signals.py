@@ -0,0 +1,24 @@
+"""
+Signal handlers invalidating cached recipe API responses
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Recipe, Tags
+from recipe.cache import bump_version_on_commit
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+def invalidate_user_lists(sender, instance, **kwargs):
+    """Bump the owner's list cache version on any write"""
+    bump_version_on_commit(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_user_lists_on_tags(sender, instance, action, **kwargs):
+    """Bump the owner's list cache version when recipe tags change"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version_on_commit(instance.user_id)
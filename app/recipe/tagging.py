@@ -0,0 +1,64 @@
+"""
+Set-based helpers for resolving and linking recipe tags
+"""
+from django.db.models import prefetch_related_objects
+
+from core.models import Recipe, Tags
+from recipe.cache import bump_version_on_commit
+
+BATCH_SIZE = 1000
+
+
+def resolve_tags(user, names):
+    """
+    Return a {name: tag} map for the user, creating missing tags.
+
+    Existing tags are fetched with one IN query and the missing ones are
+    created with one bulk_create, whatever the number of names.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    tags = {}
+    for tag in Tags.objects.filter(user=user, name__in=names).order_by("id"):
+        tags.setdefault(tag.name, tag)
+
+    missing = [Tags(user=user, name=n) for n in names if n not in tags]
+    for tag in Tags.objects.bulk_create(missing, batch_size=BATCH_SIZE):
+        tags[tag.name] = tag
+
+    return tags
+
+
+def link_tags(recipe_tags, replace=False):
+    """
+    Link recipes to tags with a single through table insert.
+
+    recipe_tags maps each recipe to the list of tags it should have. With
+    replace the recipes' existing links are removed first, otherwise the
+    new links are added to them. The recipes' prefetched tags are reloaded
+    with one query.
+    """
+    through = Recipe.tags.through
+    if replace:
+        recipe_ids = [recipe.id for recipe in recipe_tags]
+        through.objects.filter(recipe_id__in=recipe_ids).delete()
+
+    links = [
+        through(recipe_id=recipe.id, tags_id=tag.id)
+        for recipe, tags in recipe_tags.items()
+        for tag in {tag.id: tag for tag in tags}.values()
+    ]
+    through.objects.bulk_create(
+        links, batch_size=BATCH_SIZE, ignore_conflicts=not replace
+    )
+
+    recipes = list(recipe_tags)
+    for recipe in recipes:
+        getattr(recipe, "_prefetched_objects_cache", {}).pop("tags", None)
+    prefetch_related_objects(recipes, "tags")
+
+    # Raw through table writes send no m2m_changed signal.
+    for user_id in {recipe.user_id for recipe in recipes}:
+        bump_version_on_commit(user_id)
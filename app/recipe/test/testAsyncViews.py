@@ -0,0 +1,200 @@
+"""
+Tests for the async recipe, tag and profile views
+"""
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.asyncViews import AsyncAPIView
+from core.models import Recipe, Tags
+from recipe import views
+from user.authentication import token_cache
+from user.views import ManageUserView
+
+RECIPE_URL = "/api/recipe/recipes/"
+TAGS_URL = "/api/recipe/tags/"
+ME_URL = "/api/user/me/"
+
+recipe_list = AsyncAPIView.as_view(
+    views.RecipeViewSet,
+    {"get": "list", "post": "create"},
+    basename="recipe",
+    detail=False,
+)
+recipe_detail = AsyncAPIView.as_view(
+    views.RecipeViewSet,
+    {"get": "retrieve", "patch": "partial_update"},
+    basename="recipe",
+    detail=True,
+)
+tags_list = AsyncAPIView.as_view(
+    views.TagsViewSet, {"get": "list"}, basename="tags", detail=False
+)
+me = AsyncAPIView.as_view(ManageUserView)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        "title": "sample recipe title",
+        "time_minutes": 23,
+        "price": Decimal("4.64"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class AsyncViewTests(TestCase):
+    """Test the async views match the sync API"""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="async@example.com", password="testpassword", name="Async"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {"headers": {"Authorization": f"Token {self.token.key}"}}
+        self.factory = AsyncRequestFactory()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_views_are_async(self):
+        """Test Django runs the views without a thread hop"""
+        self.assertTrue(AsyncAPIView.view_is_async)
+        self.assertTrue(recipe_list.csrf_exempt)
+
+    async def test_auth_required(self):
+        """Test requests without a token are rejected"""
+        res = await recipe_list(self.factory.get(RECIPE_URL))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+    async def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected"""
+        request = self.factory.get(
+            RECIPE_URL, headers={"Authorization": "Token invalid"}
+        )
+
+        res = await recipe_list(request)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_recipe_list_matches_sync(self):
+        """Test the async list renders the same bytes as the sync view"""
+        tag = await Tags.objects.acreate(user=self.user, name="Vegan")
+        recipe = await Recipe.objects.acreate(
+            user=self.user, title="Soup", time_minutes=5, price="1.50"
+        )
+        await recipe.tags.aadd(tag)
+        query = "?page_size=1&fields=id,title,tags"
+
+        request = self.factory.get(RECIPE_URL + query, **self.auth)
+        res = await recipe_list(request)
+        await cache.aclear()
+        expected = await self.sync_get(RECIPE_URL + query)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(res["Content-Type"], "application/json")
+
+    async def test_recipe_list_not_modified(self):
+        """Test the list ETag is honoured by the async view"""
+        request = self.factory.get(RECIPE_URL, **self.auth)
+        etag = (await recipe_list(request))["ETag"]
+
+        request = self.factory.get(
+            RECIPE_URL,
+            headers={"If-None-Match": etag, **self.auth["headers"]},
+        )
+        res = await recipe_list(request)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_invalid_filter_rejected(self):
+        """Test validation errors are reported as by the sync view"""
+        request = self.factory.get(RECIPE_URL + "?fields=secret", **self.auth)
+
+        res = await recipe_list(request)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recipe_detail(self):
+        """Test retrieving a recipe and hiding other users' recipes"""
+        recipe = create_recipe(self.user, description="Hot")
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpassword"
+        )
+        hidden = create_recipe(other)
+
+        res = self.async_get(recipe_detail, recipe.id)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.content,
+            self.client.get(f"{RECIPE_URL}{recipe.id}/").content,
+        )
+
+        res = self.async_get(recipe_detail, hidden.id)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_use_sync_view(self):
+        """Test non-GET requests are handled by the DRF view"""
+        request = self.factory.post(
+            RECIPE_URL,
+            {"title": "New", "time_minutes": 5, "price": "1.00"},
+            content_type="application/json",
+            **self.auth,
+        )
+
+        res = self.run_view(recipe_list, request)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Recipe.objects.filter(title="New").exists())
+
+    async def test_browsable_api_uses_sync_view(self):
+        """Test HTML requests fall back to the browsable API"""
+        request = self.factory.get(
+            RECIPE_URL,
+            headers={"Accept": "text/html", **self.auth["headers"]},
+        )
+
+        res = await recipe_list(request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("text/html", res["Content-Type"])
+
+    async def test_tags_list(self):
+        """Test listing tags"""
+        await Tags.objects.acreate(user=self.user, name="Vegan")
+
+        res = await tags_list(self.factory.get(TAGS_URL, **self.auth))
+        await cache.aclear()
+        expected = await self.sync_get(TAGS_URL)
+
+        self.assertEqual(res.content, expected.content)
+
+    async def test_me(self):
+        """Test retrieving the profile"""
+        res = await me(self.factory.get(ME_URL, **self.auth))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.content, b'{"email":"async@example.com","name":"Async"}'
+        )
+
+    async def sync_get(self, url):
+        return await sync_to_async(self.client.get)(url)
+
+    def async_get(self, view, pk):
+        request = self.factory.get(f"{RECIPE_URL}{pk}/", **self.auth)
+        return self.run_view(view, request, pk=str(pk))
+
+    def run_view(self, view, request, **kwargs):
+        return async_to_sync(view)(request, **kwargs)
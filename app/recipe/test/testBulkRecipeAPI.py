@@ -0,0 +1,136 @@
+"""
+Tests for the bulk recipe API
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tags
+
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        "title": "sample recipe title",
+        "time_minutes": 23,
+        "price": Decimal("4.64"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class BulkRecipeAPITests(TestCase):
+    """Test bulk create, update and delete of recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="bulk@example.com", password="testpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_with_tags(self):
+        """Test creating many recipes with tags in one request"""
+        Tags.objects.create(user=self.user, name="Vegan")
+        payload = [
+            {
+                "title": f"Recipe {i}",
+                "time_minutes": i,
+                "price": "1.50",
+                "tags": ["Vegan", "Quick"],
+            }
+            for i in range(20)
+        ]
+
+        with self.assertNumQueries(7):
+            res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(res.data[0]["tags"], ["Quick", "Vegan"])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 20)
+        self.assertEqual(Tags.objects.filter(user=self.user).count(), 2)
+        recipe = Recipe.objects.get(id=res.data[0]["id"])
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Quick", "Vegan"],
+        )
+
+    def test_bulk_create_invalid_item_writes_nothing(self):
+        """Test one invalid item rejects the whole batch"""
+        payload = [
+            {"title": "Valid", "time_minutes": 5, "price": "1.00"},
+            {"title": "Invalid", "time_minutes": "soon", "price": "1.00"},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("time_minutes", res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_update(self):
+        """Test partially updating many recipes in one request"""
+        first = create_recipe(user=self.user, title="First")
+        second = create_recipe(user=self.user, title="Second")
+        payload = [
+            {"id": first.id, "title": "Updated"},
+            {"id": second.id, "price": "9.99", "tags": ["Dinner"]},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.title, "Updated")
+        self.assertEqual(second.price, Decimal("9.99"))
+        self.assertEqual(second.title, "Second")
+        self.assertEqual(res.data[1]["tags"], ["Dinner"])
+        self.assertEqual(
+            list(second.tags.values_list("name", flat=True)), ["Dinner"]
+        )
+
+    def test_bulk_update_other_users_recipe(self):
+        """Test recipes of other users cannot be updated"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpassword"
+        )
+        recipe = create_recipe(user=other, title="Theirs")
+
+        payload = [{"id": recipe.id, "title": "Mine"}]
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Theirs")
+
+    def test_bulk_delete(self):
+        """Test deleting many recipes reports a result per id"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpassword"
+        )
+        mine = create_recipe(user=self.user)
+        theirs = create_recipe(user=other)
+
+        res = self.client.delete(
+            BULK_URL, [mine.id, theirs.id], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"id": mine.id, "deleted": True},
+                {"id": theirs.id, "deleted": False},
+            ],
+        )
+        self.assertFalse(Recipe.objects.filter(id=mine.id).exists())
+        self.assertTrue(Recipe.objects.filter(id=theirs.id).exists())
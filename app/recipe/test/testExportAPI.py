@@ -0,0 +1,105 @@
+"""
+Tests for the recipe export API
+"""
+import csv
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tags
+from recipe.export import aiter_lines
+
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+class ExportRecipeAPITests(TestCase):
+    """Test streaming recipe exports"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="export@example.com", password="testpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Soup, hot",
+            time_minutes=20,
+            price=Decimal("3.5"),
+            description="Line one\nline two",
+        )
+        self.recipe.tags.add(
+            Tags.objects.create(user=self.user, name="Vegan"),
+            Tags.objects.create(user=self.user, name="Dinner"),
+        )
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpassword"
+        )
+        Recipe.objects.create(
+            user=other, title="Theirs", time_minutes=1, price=Decimal("1")
+        )
+
+    def test_export_ndjson(self):
+        """Test recipes are streamed as newline delimited JSON"""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "id": self.recipe.id,
+                    "title": "Soup, hot",
+                    "time_minutes": 20,
+                    "price": "3.50",
+                    "description": "Line one\nline two",
+                    "tags": ["Dinner", "Vegan"],
+                }
+            ],
+        )
+
+    def test_export_csv(self):
+        """Test recipes are streamed as CSV with joined tags"""
+        res = self.client.get(EXPORT_URL, {"type": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        content = b"".join(res.streaming_content).decode()
+        rows = list(csv.DictReader(content.splitlines(keepends=True)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Soup, hot")
+        self.assertEqual(rows[0]["description"], "Line one\nline two")
+        self.assertEqual(rows[0]["tags"], "Dinner|Vegan")
+
+    def test_export_unknown_type(self):
+        """Test an unknown export type is rejected"""
+        res = self.client.get(EXPORT_URL, {"type": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_export_asgi(self):
+        """Test exports are streamed from an async iterator under ASGI"""
+        token = await Token.objects.acreate(user=self.user)
+        headers = {"Authorization": f"Token {token.key}"}
+
+        res = await self.async_client.get(EXPORT_URL, headers=headers)
+
+        self.assertTrue(res.is_async)
+        lines = [line async for line in res.streaming_content]
+        self.assertEqual(json.loads(lines[0])["title"], "Soup, hot")
+        self.assertEqual(len(lines), 1)
+
+    async def test_async_lines_batched(self):
+        """Test the sync lines are all yielded, a batch at a time"""
+        lines = iter(range(5))
+
+        result = [line async for line in aiter_lines(lines, batch_size=2)]
+
+        self.assertEqual(result, [0, 1, 2, 3, 4])
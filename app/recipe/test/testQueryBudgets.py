@@ -0,0 +1,208 @@
+"""
+Query and latency budgets of the recipe API
+"""
+import math
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import benchmark
+from core.models import Recipe
+from core.testing import QueryBudgetMixin
+from recipe.export import CHUNK_SIZE
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tags-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+EXPORT_URL = reverse("recipe:recipe-export")
+# Items per bulk request, up to the dataset size.
+BULK_ITEMS = 100
+
+
+class RecipeQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test the recipe endpoints do not grow with the user's recipes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # One user per dataset size, with two of ten tags on each recipe.
+        cls.datasets = {}
+        for size in cls.dataset_sizes:
+            user = get_user_model().objects.create_user(
+                email=f"budget{size}@example.com", password="testpass123"
+            )
+            cls.datasets[size] = user, benchmark.seed_recipes(user, size)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, size):
+        """Log in as the user with size recipes"""
+        user, tags = self.datasets[size]
+        self.client.force_authenticate(user)
+        return user, tags
+
+    def get_recipes(self, size):
+        """Log in and return up to BULK_ITEMS of the user's recipes"""
+        user, tags = self.login(size)
+        return list(Recipe.objects.filter(user=user)[:BULK_ITEMS])
+
+    def send(self, method, url, data, expected_status):
+        res = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(res.status_code, expected_status)
+        return res
+
+    def get(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_list_recipes(self):
+        """Test a page of recipes costs the same for any dataset"""
+        self.assertConstantQueries(
+            self.login, lambda data: self.get(RECIPE_URL), 2, max_seconds=0.5
+        )
+
+    def test_filter_recipes_by_tag(self):
+        """Test filtering by tag costs the same for any dataset"""
+        self.assertConstantQueries(
+            self.login,
+            lambda data: self.get(RECIPE_URL, {"tags": data[1][0].id}),
+            2,
+            max_seconds=0.5,
+        )
+
+    def test_search_recipes(self):
+        """Test searching costs the same number of queries"""
+        self.assertConstantQueries(
+            self.login,
+            lambda data: self.get(RECIPE_URL, {"search": "recipe"}),
+            2,
+            max_seconds=1.0,
+        )
+
+    def test_retrieve_recipe(self):
+        """Test a recipe detail costs the same for any dataset"""
+
+        def prepare(size):
+            user, tags = self.login(size)
+            return Recipe.objects.filter(user=user).last()
+
+        def call(recipe):
+            self.get(reverse("recipe:recipe-detail", args=[recipe.id]))
+
+        self.assertConstantQueries(prepare, call, 2, max_seconds=0.2)
+
+    def test_list_tags(self):
+        """Test listing tags costs the same for any dataset"""
+        self.assertConstantQueries(
+            self.login, lambda data: self.get(TAGS_URL), 1, max_seconds=0.2
+        )
+
+    def test_create_recipe(self):
+        """Test creating a tagged recipe costs the same for any dataset"""
+        payload = {
+            "title": "Budget recipe",
+            "time_minutes": 5,
+            "price": "1.00",
+            "tags": ["tag 0", "New tag"],
+        }
+        self.assertConstantQueries(
+            self.login,
+            lambda data: self.send(
+                "post", RECIPE_URL, payload, status.HTTP_201_CREATED
+            ),
+            7,
+            max_seconds=0.5,
+        )
+
+    def test_update_recipe(self):
+        """Test updating a recipe and its tags costs the same"""
+
+        def call(recipe):
+            self.send(
+                "patch",
+                reverse("recipe:recipe-detail", args=[recipe.id]),
+                {"title": "Renamed", "tags": ["tag 1", "New tag"]},
+                status.HTTP_200_OK,
+            )
+
+        self.assertConstantQueries(
+            lambda size: self.get_recipes(size)[0], call, 12, max_seconds=0.5
+        )
+
+    def test_delete_recipe(self):
+        """Test deleting a recipe costs the same for any dataset"""
+
+        def call(recipe):
+            self.send(
+                "delete",
+                reverse("recipe:recipe-detail", args=[recipe.id]),
+                None,
+                status.HTTP_204_NO_CONTENT,
+            )
+
+        self.assertConstantQueries(
+            lambda size: self.get_recipes(size)[0], call, 4, max_seconds=0.5
+        )
+
+    def test_bulk_create(self):
+        """Test bulk creation costs the same for 1 to BULK_ITEMS items"""
+
+        def prepare(size):
+            self.login(size)
+            return [
+                {
+                    "title": f"Bulk {index}",
+                    "time_minutes": index,
+                    "price": "1.00",
+                    "tags": ["tag 0", f"Bulk tag {index}"],
+                }
+                for index in range(min(size, BULK_ITEMS))
+            ]
+
+        self.assertConstantQueries(
+            prepare,
+            lambda payload: self.send(
+                "post", BULK_URL, payload, status.HTTP_201_CREATED
+            ),
+            7,
+            max_seconds=1.0,
+        )
+
+    def test_bulk_update(self):
+        """Test bulk updates cost the same for 1 to BULK_ITEMS items"""
+
+        def call(recipes):
+            payload = [
+                {"id": recipe.id, "title": "Renamed", "tags": ["tag 2"]}
+                for recipe in recipes
+            ]
+            self.send("patch", BULK_URL, payload, status.HTTP_200_OK)
+
+        self.assertConstantQueries(self.get_recipes, call, 9, max_seconds=1.0)
+
+    def test_bulk_delete(self):
+        """Test bulk deletes cost the same for 1 to BULK_ITEMS items"""
+
+        def call(recipes):
+            ids = [recipe.id for recipe in recipes]
+            self.send("delete", BULK_URL, ids, status.HTTP_200_OK)
+
+        self.assertConstantQueries(self.get_recipes, call, 7, max_seconds=1.0)
+
+    def test_export(self):
+        """Test the export prefetches tags once per chunk of recipes"""
+        for size in self.dataset_sizes:
+            with self.subTest(size=size):
+                self.login(size)
+                budget = 1 + math.ceil(size / CHUNK_SIZE)
+                with self.assertQueryBudget(budget, max_seconds=5.0):
+                    res = self.get(EXPORT_URL)
+                    lines = b"".join(res.streaming_content).splitlines()
+
+                self.assertEqual(len(lines), size)
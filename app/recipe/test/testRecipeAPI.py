@@ -2,13 +2,17 @@
 Tests for Recipe APi
 """
 
+import base64
+import json
 from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
-from core.models import Recipe
+from core.models import Recipe, Tags
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPE_URL = reverse("recipe:recipe-list")
@@ -59,6 +63,7 @@ class PrivateRecipeAPITests(TestCase):
     """
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = create_user(
             email="test@example.com", password="testpassword"
@@ -77,7 +82,57 @@ class PrivateRecipeAPITests(TestCase):
 
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(status.HTTP_200_OK, res.status_code)
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
+        self.assertIsNone(res.data["next"])
+
+    def test_recipes_paginated_by_cursor(self):
+        """Test following the next cursor walks every recipe once"""
+
+        recipes = [create_recipe(user=self.user) for _ in range(5)]
+        expected = [recipe.id for recipe in reversed(recipes)]
+
+        seen = []
+        url = RECIPE_URL + "?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data["results"]), 2)
+            seen.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_recipes_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+
+        res = self.client.get(RECIPE_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_recipes_cursor_wrong_type(self):
+        """Test a well-formed cursor holding the wrong types is rejected"""
+        for position in [[{"a": 1}], ["x"], [None]]:
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode())
+
+            res = self.client.get(RECIPE_URL, {"cursor": cursor.decode()})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_recipes_limited_to_user(self):
+        """Test only the authenticated user's recipes are listed"""
+
+        other_user = create_user(
+            email="other@example.com", password="testpassword"
+        )
+        create_recipe(user=other_user)
+        recipe = create_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [recipe.id]
+        )
 
     def test_get_recipe_detail(self):
         """Test getting recipe details"""
@@ -180,3 +235,195 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_create_recipe_with_tags(self):
+        """Test creating a recipe reuses existing tags and creates new ones"""
+
+        existing = Tags.objects.create(user=self.user, name="Vegan")
+        other_user = create_user(
+            email="other@example.com", password="testpassword"
+        )
+        Tags.objects.create(user=other_user, name="Dinner")
+        payload = {
+            "title": "Curry",
+            "time_minutes": 30,
+            "price": "5.50",
+            "tags": ["Vegan", "Dinner", "Vegan"],
+        }
+
+        res = self.client.post(RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["tags"], ["Dinner", "Vegan"])
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertIn(existing, recipe.tags.all())
+        self.assertEqual(Tags.objects.filter(user=self.user).count(), 2)
+        for tag in recipe.tags.all():
+            self.assertEqual(tag.user, self.user)
+
+    def test_update_recipe_replaces_tags(self):
+        """Test updating a recipe's tags replaces the previous ones"""
+
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tags.objects.create(user=self.user, name="Breakfast"))
+
+        res = self.client.patch(
+            detail_url(recipe.id), {"tags": ["Lunch"]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tags"], ["Lunch"])
+        self.assertEqual(
+            list(recipe.tags.values_list("name", flat=True)), ["Lunch"]
+        )
+
+    def test_update_recipe_clears_tags(self):
+        """Test an empty tag list removes every tag from the recipe"""
+
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tags.objects.create(user=self.user, name="Breakfast"))
+
+        res = self.client.patch(
+            detail_url(recipe.id), {"tags": []}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.tags.count(), 0)
+
+    def test_list_recipes_tags_without_n_plus_one(self):
+        """Test listing recipes with tags uses a fixed number of queries"""
+
+        tag = Tags.objects.create(user=self.user, name="Vegan")
+        for _ in range(5):
+            create_recipe(user=self.user).tags.add(tag)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPE_URL)
+
+        for item in res.data["results"]:
+            self.assertEqual(item["tags"], ["Vegan"])
+
+    def test_search_recipes(self):
+        """Test searching matches every term by prefix in title or text"""
+
+        curry = create_recipe(
+            user=self.user,
+            title="Chickpea curry",
+            description="A spicy dinner",
+        )
+        create_recipe(user=self.user, title="Chickpea salad")
+        create_recipe(user=self.user, title="Beef curry")
+
+        res = self.client.get(RECIPE_URL, {"search": "chick spic"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [curry.id]
+        )
+
+    def test_search_recipes_paginated(self):
+        """Test search results can be paged through with the cursor"""
+
+        for index in range(5):
+            create_recipe(user=self.user, title=f"Pancake {index}")
+        create_recipe(user=self.user, title="Waffle")
+
+        seen = []
+        url = RECIPE_URL + "?search=pancake&page_size=2"
+        while url:
+            res = self.client.get(url)
+            seen.extend(item["title"] for item in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(
+            sorted(seen), [f"Pancake {index}" for index in range(5)]
+        )
+
+    def test_search_without_terms(self):
+        """Test a search with no usable terms returns nothing"""
+
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL, {"search": "  !! "})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_filter_by_tags(self):
+        """Test filtering by tags returns each matching recipe once"""
+
+        vegan = Tags.objects.create(user=self.user, name="Vegan")
+        quick = Tags.objects.create(user=self.user, name="Quick")
+        both = create_recipe(user=self.user, title="Both")
+        both.tags.add(vegan, quick)
+        one = create_recipe(user=self.user, title="One")
+        one.tags.add(quick)
+        create_recipe(user=self.user, title="None")
+
+        res = self.client.get(RECIPE_URL, {"tags": f"{vegan.id},{quick.id}"})
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [one.id, both.id]
+        )
+
+    def test_filter_by_price_and_time(self):
+        """Test filtering by price and time ranges"""
+
+        match = create_recipe(
+            user=self.user, price=Decimal("10.00"), time_minutes=20
+        )
+        create_recipe(user=self.user, price=Decimal("25.00"), time_minutes=20)
+        create_recipe(user=self.user, price=Decimal("10.00"), time_minutes=45)
+
+        res = self.client.get(
+            RECIPE_URL, {"price_max": "20", "time_max": "30"}
+        )
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [match.id]
+        )
+
+    def test_filter_invalid_values(self):
+        """Test malformed filters are rejected"""
+
+        res = self.client.get(RECIPE_URL, {"tags": "1,abc", "time_max": "x"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", res.data)
+        self.assertIn("time_max", res.data)
+
+    def test_list_json_matches_serializer(self):
+        """Test the values() list path renders the serializer's exact JSON"""
+
+        tag = Tags.objects.create(user=self.user, name="Vegan")
+        create_recipe(user=self.user, price=Decimal("4.5")).tags.add(tag)
+        create_recipe(user=self.user, title="Caf\u00e9 \u2028 au lait")
+
+        res = self.client.get(RECIPE_URL, format="json")
+
+        recipes = Recipe.objects.order_by("-id")
+        expected = JSONRenderer().render(
+            {
+                "next": None,
+                "results": RecipeSerializer(recipes, many=True).data,
+            }
+        )
+        self.assertEqual(res.content, expected)
+
+    def test_list_sparse_fields(self):
+        """Test ?fields= limits the fields returned"""
+
+        recipe = create_recipe(user=self.user, title="Sparse")
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_URL, {"fields": "title,id"})
+
+        self.assertEqual(
+            res.data["results"], [{"id": recipe.id, "title": "Sparse"}]
+        )
+
+    def test_list_unknown_sparse_field(self):
+        """Test requesting an unknown or write-only field is rejected"""
+
+        res = self.client.get(RECIPE_URL, {"fields": "id,user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,143 @@
+"""
+Tests for the recipe API list response cache
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tags
+from recipe.cache import get_version
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tags-list")
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        "title": "sample recipe title",
+        "time_minutes": 23,
+        "price": Decimal("4.64"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ResponseCacheTests(TestCase):
+    """Test caching of list responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="cache@example.com", password="testpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request does not query the database"""
+        create_recipe(user=self.user)
+        first = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPE_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_not_modified_with_matching_etag(self):
+        """Test If-None-Match returns 304 without touching the database"""
+        create_recipe(user=self.user)
+        res = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_create_invalidates_list(self):
+        """Test creating a recipe through the API refreshes the list"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+        payload = {"title": "New", "time_minutes": 5, "price": "1.00"}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(RECIPE_URL, payload)
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_update_and_delete_invalidate_list(self):
+        """Test updating and deleting a recipe refresh the list"""
+        recipe = create_recipe(user=self.user, title="Old")
+        url = reverse("recipe:recipe-detail", args=[recipe.id])
+        self.client.get(RECIPE_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"title": "New"})
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["results"][0]["title"], "New")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["results"], [])
+
+    def test_tag_changes_invalidate_lists(self):
+        """Test creating tags and linking them to recipes bumps the version"""
+        recipe = create_recipe(user=self.user)
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tags.objects.create(user=self.user, name="Vegan")
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(RECIPE_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.tags.add(tag)
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_version_bumped_on_commit(self):
+        """Test writes bump the version only once their transaction commits"""
+        version = get_version(self.user.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_recipe(user=self.user)
+            # A list read before the commit must not cache the old rows
+            # under a version that is already new.
+            self.assertEqual(get_version(self.user.pk), version)
+
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_version(self.user.pk), version)
+
+    def test_cache_is_per_user(self):
+        """Test cached lists are not shared between users"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpassword"
+        )
+        create_recipe(user=other)
+        self.client.get(RECIPE_URL)
+
+        self.client.force_authenticate(user=other)
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    @override_settings(RESPONSE_CACHE_MAX_BYTES=1)
+    def test_oversized_response_not_cached(self):
+        """Test responses over the size limit are not stored"""
+        create_recipe(user=self.user)
+        self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(2):
+            self.client.get(RECIPE_URL)
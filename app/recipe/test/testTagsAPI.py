@@ -48,8 +48,36 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL)
 
-        tags = Tags.objects.all().order_by("-name")
+        tags = Tags.objects.all().order_by("-name", "-id")
         serializer = TagsSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_tags_paginated_with_duplicate_names(self):
+        """Test the (name, id) cursor does not skip tags sharing a name"""
+
+        for name in ["Vegan", "Vegan", "Sweets", "Vegan", "Dinner"]:
+            Tags.objects.create(user=self.user, name=name)
+        expected = list(
+            Tags.objects.order_by("-name", "-id").values_list("id", flat=True)
+        )
+
+        seen = []
+        url = TAGS_URL + "?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_tags_sparse_fields(self):
+        """Test ?fields= limits the tag fields returned"""
+
+        Tags.objects.create(user=self.user, name="Vegan")
+
+        res = self.client.get(TAGS_URL, {"fields": "name"})
+
+        self.assertEqual(res.data["results"], [{"name": "Vegan"}])
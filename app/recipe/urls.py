@@ -1,7 +1,9 @@
 """Urls mapping for recipe app"""
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from core.asyncViews import AsyncAPIView
 from recipe import views
 
 router = DefaultRouter()
@@ -10,6 +12,46 @@ router.register("tags", views.TagsViewSet)
 
 app_name = "recipe"
 
+# Same names as the router's routes, which stay in place for the extra
+# actions (hence int ids only) and format suffixes.
+async_urlpatterns = [
+    path(
+        "recipes/",
+        AsyncAPIView.as_view(
+            views.RecipeViewSet,
+            {"get": "list", "post": "create"},
+            basename="recipe",
+            detail=False,
+        ),
+        name="recipe-list",
+    ),
+    path(
+        "recipes/<int:pk>/",
+        AsyncAPIView.as_view(
+            views.RecipeViewSet,
+            {
+                "get": "retrieve",
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            },
+            basename="recipe",
+            detail=True,
+        ),
+        name="recipe-detail",
+    ),
+    path(
+        "tags/",
+        AsyncAPIView.as_view(
+            views.TagsViewSet, {"get": "list"}, basename="tags", detail=False
+        ),
+        name="tags-list",
+    ),
+]
+
 urlpatterns = [
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -2,30 +2,72 @@
 Views for recipe API endpoints
 """
 
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status, viewsets, mixins
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from core.asyncViews import AsyncRetrieveMixin
 from core.models import Recipe, Tags
+from core.replicas import ReplicaReadsMixin
+from recipe import bulk
+from recipe.cache import CachedListMixin
+from recipe.export import EXPORTERS, aiter_lines
+from recipe.filters import filter_recipes
+from recipe.pagination import RecipePagination, TagsPagination
+from recipe.search import search_recipes
+from recipe.sparse import SparseFieldsMixin
 from recipe.serializers import (
     RecipeDetailSerializer,
     RecipeSerializer,
     TagsSerializer,
 )
+from user.authentication import CachedTokenAuthentication
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ReplicaReadsMixin,
+    CachedListMixin,
+    SparseFieldsMixin,
+    AsyncRetrieveMixin,
+    viewsets.ModelViewSet,
+):
     """Views to manage Recipe API endpoints"""
 
     serializer_class = RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipePagination
+    bulk_max_items = 10000
+    pagination_ordering = None
 
     def get_queryset(self):
         """Retrieve recipe for authenticated user"""
 
-        return self.queryset.filter(user=self.request.user).order_by("-id")
+        queryset = (
+            self.queryset.filter(user=self.request.user)
+            .prefetch_related("tags")
+            .order_by("-id")
+        )
+
+        if self.action != "list":
+            return queryset
+
+        queryset = filter_recipes(queryset, self.request.query_params)
+        search = self.request.query_params.get("search")
+        if search is not None:
+            queryset, self.pagination_ordering = search_recipes(
+                queryset, search
+            )
+
+        return queryset
+
+    def get_pagination_ordering(self):
+        """Return the ordering of search results, if searching"""
+        return self.pagination_ordering
 
     def get_serializer_class(self):
         """Return the serializer class for request"""
@@ -39,15 +81,105 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Method for creating Recipes"""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every recipe of the user as NDJSON (default) or CSV"""
+        export_type = request.query_params.get("type", "ndjson")
+        if export_type not in EXPORTERS:
+            raise serializers.ValidationError(
+                {"type": [f"Expected one of: {', '.join(EXPORTERS)}."]}
+            )
+
+        exporter, content_type = EXPORTERS[export_type]
+        lines = exporter(self.get_queryset())
+        if isinstance(request._request, ASGIRequest):
+            lines = aiter_lines(lines)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes.{export_type}"'
+        )
+        return response
+
+    def get_bulk_ids(self, ids):
+        """Validate a list of recipe ids from the request body"""
+        field = serializers.ListField(
+            child=serializers.IntegerField(),
+            max_length=self.bulk_max_items,
+        )
+        return field.run_validation(ids)
+
+    @action(
+        detail=False, methods=["post"], url_path="bulk", url_name="bulk"
+    )
+    def bulk_create(self, request):
+        """Create a list of recipes in a single transaction"""
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_items
+        )
+        serializer.is_valid(raise_exception=True)
+        recipes = bulk.create_recipes(request.user, serializer.validated_data)
+
+        data = self.get_serializer(recipes, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a list of recipes in a single transaction"""
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Expected a list of recipes."]}
+            )
+        ids = self.get_bulk_ids(
+            [
+                item.get("id") if isinstance(item, dict) else None
+                for item in request.data
+            ]
+        )
+        recipes = self.get_queryset().in_bulk(ids)
+        missing = [
+            {"id": ["Recipe not found."]} if pk not in recipes else {}
+            for pk in ids
+        ]
+        if any(missing):
+            raise serializers.ValidationError(missing)
+
+        instances = [recipes[pk] for pk in ids]
+        serializer = self.get_serializer(
+            instances, data=request.data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        bulk.update_recipes(
+            request.user, instances, serializer.validated_data
+        )
+
+        return Response(self.get_serializer(instances, many=True).data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete a list of recipes by id in a single transaction"""
+        ids = self.get_bulk_ids(request.data)
+        deleted = bulk.delete_recipes(self.get_queryset(), ids)
+
+        return Response([{"id": pk, "deleted": pk in deleted} for pk in ids])
+
 
-class TagsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class TagsViewSet(
+    ReplicaReadsMixin,
+    CachedListMixin,
+    SparseFieldsMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     """Views to manage Tags View"""
 
     serializer_class = TagsSerializer
     queryset = Tags.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = TagsPagination
 
     def get_queryset(self):
         """Retrieve Tags for authenticated user"""
-        return self.queryset.filter(user=self.request.user).order_by("-name")
+        return self.queryset.filter(user=self.request.user).order_by(
+            "-name", "-id"
+        )
@@ -0,0 +1,228 @@
+"""
+Token authentication with a cached token lookup
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core import metrics
+from core.timing import measure
+
+
+class TokenCache:
+    """Bounded, thread safe LRU map of token key to (user, token)"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached entry for a key, if it has not expired"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """Cache an entry, evicting the least recently used if full"""
+        ttl = getattr(settings, "TOKEN_CACHE_TTL", 30)
+        max_size = getattr(settings, "TOKEN_CACHE_MAX_SIZE", 10000)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def get_shared_cache():
+    """Return the cache shared between processes, if one is configured"""
+    alias = getattr(settings, "TOKEN_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def shared_key(key):
+    return f"auth:token:{key}"
+
+
+def invalidate_token(key):
+    """Drop a token from every cache layer"""
+    token_cache.delete(key)
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.delete(shared_key(key))
+
+
+def invalidate_user(user_id):
+    """Drop the tokens of a user from every cache layer"""
+    keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+    for key in keys:
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that skips the Token/User query on a cache hit.
+
+    Entries expire after TOKEN_CACHE_TTL seconds and are invalidated when
+    the token is deleted, the user is deactivated or the password changes
+    (see user.signals). Only the process making the change drops its
+    per-process entry, and that layer is checked before the shared cache
+    of TOKEN_CACHE_ALIAS, so other processes may keep serving a revoked
+    or stale user for up to TOKEN_CACHE_TTL seconds either way.
+    """
+
+    def authenticate(self, request):
+        try:
+            key = self.get_key(request)
+            if key is None:
+                return None
+            with measure("auth"):
+                return self.authenticate_credentials(key)
+        except AuthenticationFailed:
+            metrics.inc("auth_failures_total", reason="token")
+            raise
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate, for core.asyncViews"""
+        try:
+            key = self.get_key(request)
+            if key is None:
+                return None
+            with measure("auth"):
+                return await self.aauthenticate_credentials(key)
+        except AuthenticationFailed:
+            metrics.inc("auth_failures_total", reason="token")
+            raise
+
+    def get_key(self, request):
+        """Return the token key from the Authorization header, if any"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _("Invalid token header. No credentials provided.")
+            raise AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _(
+                "Invalid token header. Token string should not contain spaces."
+            )
+            raise AuthenticationFailed(msg)
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            msg = _(
+                "Invalid token header. "
+                "Token string should not contain invalid characters."
+            )
+            raise AuthenticationFailed(msg)
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            entry = self.get_shared_entry(key)
+
+        metrics.inc(
+            "cache_requests_total",
+            cache="token",
+            result="miss" if entry is None else "hit",
+        )
+        if entry is None:
+            entry = super().authenticate_credentials(key)
+            self.set_shared_entry(key, entry)
+            token_cache.set(key, entry)
+
+        user, token = entry
+        # Views may modify request.user, never hand out the cached instance.
+        return copy.copy(user), token
+
+    async def aauthenticate_credentials(self, key):
+        """Async counterpart of authenticate_credentials"""
+        entry = token_cache.get(key)
+        if entry is None:
+            entry = await self.aget_shared_entry(key)
+
+        metrics.inc(
+            "cache_requests_total",
+            cache="token",
+            result="miss" if entry is None else "hit",
+        )
+        if entry is None:
+            tokens = self.get_model().objects.select_related("user")
+            try:
+                token = await tokens.aget(key=key)
+            except tokens.model.DoesNotExist:
+                raise AuthenticationFailed(_("Invalid token."))
+
+            if not token.user.is_active:
+                raise AuthenticationFailed(_("User inactive or deleted."))
+
+            entry = (token.user, token)
+            await self.aset_shared_entry(key, entry)
+            token_cache.set(key, entry)
+
+        user, token = entry
+        return copy.copy(user), token
+
+    def get_shared_entry(self, key):
+        shared = get_shared_cache()
+        if shared is None:
+            return None
+
+        entry = shared.get(shared_key(key))
+        if entry is not None:
+            token_cache.set(key, entry)
+        return entry
+
+    def set_shared_entry(self, key, entry):
+        shared = get_shared_cache()
+        if shared is not None:
+            ttl = getattr(settings, "TOKEN_CACHE_TTL", 30)
+            shared.set(shared_key(key), entry, timeout=ttl)
+
+    async def aget_shared_entry(self, key):
+        shared = get_shared_cache()
+        if shared is None:
+            return None
+
+        entry = await shared.aget(shared_key(key))
+        if entry is not None:
+            token_cache.set(key, entry)
+        return entry
+
+    async def aset_shared_entry(self, key, entry):
+        shared = get_shared_cache()
+        if shared is not None:
+            ttl = getattr(settings, "TOKEN_CACHE_TTL", 30)
+            await shared.aset(shared_key(key), entry, timeout=ttl)
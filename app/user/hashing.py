@@ -0,0 +1,130 @@
+"""
+Password hashing on a bounded worker pool
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    """Every hashing slot is taken, the client should retry later"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many sign in requests, try again shortly.")
+    default_code = "hashing_busy"
+
+    def __init__(self, wait):
+        super().__init__()
+        # Sent as the Retry-After header by DRF's exception handler.
+        self.wait = wait
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with the iteration count from PASSWORD_HASH_ITERATIONS"""
+
+    @property
+    def iterations(self):
+        return getattr(
+            settings,
+            "PASSWORD_HASH_ITERATIONS",
+            hashers.PBKDF2PasswordHasher.iterations,
+        )
+
+
+class HashingPool:
+    """
+    Run hashing calls on a few threads, refusing work when saturated.
+
+    PBKDF2 releases the GIL, so the workers hash in parallel while the
+    request threads wait on them. At most workers + queue_size calls are
+    in flight; past that HashingBusy is raised at once instead of letting
+    requests pile up behind the CPU.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, func, *args):
+        """Call func in the pool and return its result"""
+        if not self.slots.acquire(blocking=False):
+            raise HashingBusy(
+                getattr(settings, "PASSWORD_HASH_RETRY_AFTER", 1)
+            )
+
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the pool for the configured size"""
+    size = (
+        getattr(settings, "PASSWORD_HASH_WORKERS", 2),
+        getattr(settings, "PASSWORD_HASH_QUEUE_SIZE", 32),
+    )
+    with _pools_lock:
+        if size not in _pools:
+            _pools[size] = HashingPool(*size)
+        return _pools[size]
+
+
+def make_password(raw_password):
+    """hashers.make_password, run in the pool"""
+    return get_pool().run(hashers.make_password, raw_password)
+
+
+def set_password(user, raw_password):
+    """user.set_password with the hashing done in the pool"""
+    user.password = make_password(raw_password)
+    user._password = raw_password
+
+
+def check_password(user, raw_password):
+    """
+    user.check_password with the hashing done in the pool.
+
+    Outdated hashes are upgraded and saved on the calling thread, so all
+    database work stays on the request's connection.
+    """
+    upgrade = []
+    valid = get_pool().run(
+        hashers.check_password, raw_password, user.password, upgrade.append
+    )
+    if valid and upgrade:
+        set_password(user, raw_password)
+        user._password = None
+        user.save(update_fields=["password"])
+
+    return valid
+
+
+def authenticate(email, password):
+    """ModelBackend.authenticate with the hashing done in the pool"""
+    user_model = get_user_model()
+    try:
+        user = user_model._default_manager.get_by_natural_key(email)
+    except user_model.DoesNotExist:
+        # Hash anyway so response times do not reveal which emails exist.
+        make_password(password)
+        return None
+
+    if check_password(user, password) and user.is_active:
+        return user
+    return None
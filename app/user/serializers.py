@@ -1,15 +1,15 @@
 """
 Serializers for API view
 """
-from django.contrib.auth import (
-    get_user_model,
-    authenticate,
-)
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from django.utils.translation import gettext as _
+from core import metrics
+from core.timing import TimedSerializerMixin
+from user import hashing
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for User Objects"""
 
     class Meta:
@@ -19,18 +19,25 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """Created and return a user with encrypted password"""
-        return get_user_model().objects.create_user(**validated_data)
+        # As UserManager.create_user, hashing on the worker pool.
+        manager = get_user_model().objects
+        password = validated_data.pop("password")
+        validated_data["email"] = manager.normalize_email(
+            validated_data["email"]
+        )
+        user = manager.model(**validated_data)
+        hashing.set_password(user, password)
+        user.save()
+
+        return user
 
     def update(self, instance, validated_data):
         """Update and return the user"""
         password = validated_data.pop("password", None)
-        user = super().update(instance, validated_data)
-
         if password:
-            user.set_password(password)
-            user.save()
+            hashing.set_password(instance, password)
 
-        return user
+        return super().update(instance, validated_data)
 
 
 class AuthTokenSerializer(serializers.Serializer):
@@ -46,13 +53,10 @@ class AuthTokenSerializer(serializers.Serializer):
         """Validate and authenticate the user."""
         email = attrs.get("email")
         password = attrs.get("password")
-        user = authenticate(
-            request=self.context.get("request"),
-            username=email,
-            password=password,
-        )
+        user = hashing.authenticate(email, password)
 
         if not user:
+            metrics.inc("auth_failures_total", reason="login")
             msg = _("Unable to authenticate with provided credentials")
             raise serializers.ValidationError(msg, code="authorization")
 
@@ -0,0 +1,22 @@
+"""
+Signal handlers keeping the token authentication cache consistent
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_token, invalidate_user
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted"""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_updated_user(sender, instance, created, **kwargs):
+    """Drop cached users on deactivation, password or profile changes"""
+    if not created:
+        invalidate_user(instance.pk)
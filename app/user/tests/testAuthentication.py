@@ -0,0 +1,92 @@
+"""
+Tests for the cached token authentication
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import token_cache
+
+ME_URL = reverse("user:me")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="token@example.com",
+            password="testpassword",
+            name="Token User",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_second_request_skips_token_query(self):
+        """Test the token lookup is served from the cache"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is not accepted"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token invalidates the cached lookup"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates the cached lookup"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_does_not_save_cached_user(self):
+        """Test a profile update never writes back a stale cached user"""
+        self.client.get(ME_URL)
+        # Changed by another process, whose signals this one never sees.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password="changed-elsewhere", is_active=False
+        )
+
+        self.client.patch(ME_URL, {"name": "New Name"})
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, "New Name")
+        self.assertEqual(self.user.password, "changed-elsewhere")
+        self.assertFalse(self.user.is_active)
+
+    def test_profile_update_refreshes_cached_user(self):
+        """Test updating the profile and password drops the cached user"""
+        self.client.get(ME_URL)
+
+        payload = {"name": "New Name", "password": "newPassword"}
+        self.client.patch(ME_URL, payload)
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], payload["name"])
+        cached_user, _ = token_cache.get(self.token.key)
+        self.assertTrue(cached_user.check_password(payload["password"]))
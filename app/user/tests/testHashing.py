@@ -0,0 +1,69 @@
+"""
+Tests for password hashing on the worker pool
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import hashing
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class HashingPoolTests(TestCase):
+    """Test signup and login hash on the pool"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.payload = {"email": "hash@example.com", "password": "testpass123"}
+
+    def test_signup_uses_configured_cost(self):
+        """Test new users are hashed with PASSWORD_HASH_ITERATIONS"""
+        payload = {**self.payload, "name": "Hash"}
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email=self.payload["email"])
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(user.check_password(self.payload["password"]))
+
+    def test_login(self):
+        """Test a token is issued only for the right password"""
+        get_user_model().objects.create_user(**self.payload)
+
+        res = self.client.post(TOKEN_URL, self.payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("token", res.data)
+
+        payload = {**self.payload, "password": "wrong"}
+        res = self.client.post(TOKEN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_upgrades_hash(self):
+        """Test logging in rehashes passwords with an outdated cost"""
+        with self.settings(PASSWORD_HASH_ITERATIONS=500):
+            user = get_user_model().objects.create_user(**self.payload)
+
+        self.client.post(TOKEN_URL, self.payload)
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0)
+    def test_saturated_pool_rejected(self):
+        """Test requests get 503 with Retry-After when the pool is full"""
+        get_user_model().objects.create_user(**self.payload)
+        pool = hashing.get_pool()
+        pool.slots.acquire()
+        self.addCleanup(pool.slots.release)
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
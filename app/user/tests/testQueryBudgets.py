@@ -0,0 +1,84 @@
+"""
+Query and latency budgets of the user API
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import benchmark
+from core.testing import QueryBudgetMixin
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+ME_URL = reverse("user:me")
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test the user endpoints do not grow with the user's recipes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datasets = {}
+        for size in cls.dataset_sizes:
+            user = get_user_model().objects.create_user(
+                email=f"budget{size}@example.com", password="testpass123"
+            )
+            benchmark.seed_recipes(user, size)
+            cls.datasets[size] = user, Token.objects.create(user=user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, size):
+        """Send the token of the user with size recipes"""
+        user, token = self.datasets[size]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return user
+
+    def test_retrieve_profile(self):
+        """Test reading the profile, token lookup included"""
+
+        def call(user):
+            res = self.client.get(ME_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertConstantQueries(self.login, call, 1, max_seconds=0.2)
+
+    def test_update_profile(self):
+        """Test renaming the user, re-read from the database first"""
+
+        def call(user):
+            res = self.client.patch(ME_URL, {"name": "Renamed"})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertConstantQueries(self.login, call, 3, max_seconds=0.2)
+
+    def test_create_token(self):
+        """Test logging in, the password hash dominates the time"""
+
+        def call(user):
+            payload = {"email": user.email, "password": "testpass123"}
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertConstantQueries(
+            lambda size: self.datasets[size][0], call, 2, max_seconds=2.0
+        )
+
+    def test_create_user(self):
+        """Test signing up"""
+        payload = {
+            "email": "budget-new@example.com",
+            "password": "testpass123",
+            "name": "New",
+        }
+
+        with self.assertQueryBudget(2, max_seconds=2.0):
+            res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
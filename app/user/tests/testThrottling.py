@@ -0,0 +1,118 @@
+"""
+Tests for the login and signup rate limits
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.throttling import SlidingWindowThrottle
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+
+RATES = {
+    "login_ip": "5/min",
+    "login_email": "2/min",
+    "signup_ip": "3/hour",
+    "signup_email": "1/hour",
+}
+
+# The start of a minute and an hour, so requests fall in one window.
+NOW = 1000 * 3600.0
+
+
+@mock.patch.object(SlidingWindowThrottle, "THROTTLE_RATES", RATES)
+@mock.patch.object(SlidingWindowThrottle, "timer", lambda self: NOW)
+class ThrottlingTests(TestCase):
+    """Test brute force logins and signups are rejected"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        get_user_model().objects.create_user(
+            email="victim@example.com", password="testpass123"
+        )
+
+    def login(self, email, password="wrong", **extra):
+        return self.client.post(
+            TOKEN_URL, {"email": email, "password": password}, **extra
+        )
+
+    def test_email_limited_across_addresses(self):
+        """Test an account is locked out whatever address is used"""
+        self.login("victim@example.com", REMOTE_ADDR="10.0.0.1")
+        self.login("Victim@example.com", REMOTE_ADDR="10.0.0.2")
+
+        with mock.patch("user.hashing.check_password") as check:
+            res = self.login(
+                "victim@example.com", "testpass123", REMOTE_ADDR="10.0.0.3"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+        check.assert_not_called()
+
+    def test_ip_limited_across_emails(self):
+        """Test one address cannot try many accounts"""
+        for index in range(5):
+            res = self.login(f"user{index}@example.com")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.login("other@example.com")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_ignored(self):
+        """Test clients cannot dodge the limit with X-Forwarded-For"""
+        for index in range(5):
+            self.login(
+                f"user{index}@example.com",
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{index}",
+            )
+
+        res = self.login("other@example.com", HTTP_X_FORWARDED_FOR="10.1.1.1")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_signup_limited(self):
+        """Test signups are limited per email"""
+        payload = {"email": "new@example.com", "password": "testpass123"}
+        res = self.client.post(CREATE_USER_URL, {**payload, "name": "New"})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(CREATE_USER_URL, {**payload, "name": "New"})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class SlidingWindowTests(TestCase):
+    """Test the sliding window estimate"""
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1000 * 60.0
+        self.throttle = SlidingWindowThrottle.__new__(SlidingWindowThrottle)
+        self.throttle.rate = "4/min"
+        self.throttle.num_requests, self.throttle.duration = 4, 60
+        self.throttle.timer = lambda: self.now
+        self.throttle.get_cache_key = lambda request, view: "throttle_test"
+
+    def allow(self):
+        return self.throttle.allow_request(None, None)
+
+    def test_previous_window_weighted(self):
+        """Test the previous window counts for the part still overlapping"""
+        allowed = [self.allow() for _ in range(5)]
+        self.assertEqual(allowed, [True, True, True, True, False])
+        self.assertEqual(self.throttle.wait(), 60)
+
+        # 6s into the next window the previous one still counts 4 * 0.9.
+        self.now += 66
+        self.assertEqual([self.allow(), self.allow()], [True, False])
+        # 1 + 4 * overlap drops under 4 once the overlap is below 0.75.
+        self.assertAlmostEqual(self.throttle.wait(), 9)
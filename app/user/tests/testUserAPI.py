@@ -3,6 +3,7 @@ Tests for the User API
 """
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -22,6 +23,7 @@ class PublicUserApiTests(TestCase):
     """Test the public methods of user"""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
 
     def test_create_user_success(self):
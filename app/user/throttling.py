@@ -0,0 +1,117 @@
+"""
+Sliding window rate limits for token login and signup
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Rate limit with a two-bucket sliding window counter.
+
+    Requests are counted per fixed window and the previous window's count
+    is weighted by how much of it still overlaps the sliding window. Each
+    request costs one get_many, one add and one incr on the cache given by
+    THROTTLE_CACHE_ALIAS, whatever the rate, unlike the request history
+    list SimpleRateThrottle keeps. Rejected requests are not counted.
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "THROTTLE_CACHE_ALIAS", "default")]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        current = f"{self.key}:{int(window)}"
+        previous = f"{self.key}:{int(window) - 1}"
+        counts = self.cache.get_many([previous, current])
+        self.previous_count = counts.get(previous, 0)
+        self.current_count = counts.get(current, 0)
+        self.overlap = 1 - offset / self.duration
+
+        estimate = self.previous_count * self.overlap + self.current_count
+        if estimate >= self.num_requests:
+            return self.throttle_failure()
+
+        # Kept for two windows, until it is no longer a previous window.
+        if not self.cache.add(current, 1, timeout=2 * self.duration):
+            try:
+                self.cache.incr(current)
+            except ValueError:
+                self.cache.set(current, 1, timeout=2 * self.duration)
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Return the seconds until the estimate drops under the rate"""
+        if self.current_count < self.num_requests:
+            # Wait for enough of the previous window to slide out.
+            needed = 1 - (self.num_requests - self.current_count) / max(
+                self.previous_count, 1
+            )
+            return max(0.0, (self.overlap - 1 + needed) * self.duration)
+
+        # This window is full: wait for it to become the previous one
+        # and to slide out far enough.
+        needed = 1 - self.num_requests / self.current_count
+        return (self.overlap + needed) * self.duration
+
+
+class ScopedThrottleMixin:
+    """Take the scope from the view, as ScopedRateThrottle does"""
+
+    scope_suffix = None
+
+    def __init__(self):
+        # The rate is only known once the view is.
+        pass
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope is None:
+            return True
+
+        self.scope = f"{scope}_{self.scope_suffix}"
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class IPThrottle(ScopedThrottleMixin, SlidingWindowThrottle):
+    """Limit the requests of a client address, see NUM_PROXIES"""
+
+    scope_suffix = "ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class EmailThrottle(ScopedThrottleMixin, SlidingWindowThrottle):
+    """Limit the requests for an account, from any address"""
+
+    scope_suffix = "email"
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        email = data.get("email") if hasattr(data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": digest}
@@ -1,13 +1,20 @@
 """
 Urls mapping for User app
 """
+from django.conf import settings
 from django.urls import path
+from core.asyncViews import AsyncAPIView
 from user import views
 
 app_name = "user"
 
+if settings.ASYNC_VIEWS:
+    me_view = AsyncAPIView.as_view(views.ManageUserView)
+else:
+    me_view = views.ManageUserView.as_view()
+
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
-    path("me/", views.ManageUserView.as_view(), name="me"),
+    path("me/", me_view, name="me"),
 ]
@@ -1,9 +1,13 @@
 """
 Views for User API
 """
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
+from core.replicas import ReplicaReadsMixin
+from user.authentication import CachedTokenAuthentication
+from user.throttling import EmailThrottle, IPThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
@@ -14,6 +18,8 @@ class CreateUserView(generics.CreateAPIView):
     """Create a new user"""
 
     serializer_class = UserSerializer
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = "signup"
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -21,15 +27,26 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Checked before the serializer, so rejected logins never hash.
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = "login"
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ReplicaReadsMixin, generics.RetrieveUpdateAPIView):
     """manage and authenticate user"""
 
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """reterive and return athe authenticated user."""
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # request.user may come from the token cache; saving it would write
+        # back columns another process has changed since.
+        return get_user_model().objects.get(pk=self.request.user.pk)
+
+    async def aget(self, request, *args, **kwargs):
+        """Return the authenticated user, for core.asyncViews"""
+        return self.retrieve(request, *args, **kwargs)